@@ -49,12 +49,13 @@ setup(
         'autologging'
     ],
     extras_require={
-        'occasional': ['boto3', 'pandas', 'pymysql', 'psycopg2-binary', 'aurora-data-api', 'pyathena', 'awsglue'],
+        'occasional': ['boto3', 'pandas', 'pymysql', 'psycopg2-binary', 'aurora-data-api', 'pyathena', 'awsglue', 'zstandard', 'crc32c', 'aiobotocore'],
         'test': [
             'pymysql', 
             'psycopg2-binary',
             'aurora-data-api',
-            'moto',
+            'moto[server]',
+            'aiobotocore',
             'pytest',
             'pytest-html',
             'pytest-mock',
@@ -68,7 +68,7 @@ class S3Event(Event):
     def parse(self, payload, context):
         """Initialize the class."""
         s3_event = payload["Records"][0]
-        self.bucket = S3Bucket(arn=s3_event["s3"]["bucket"]["arn"])
+        self.bucket = S3Bucket(arn=s3_event["s3"]["bucket"]["arn"], region=s3_event.get("awsRegion"))
         self.s3object = S3Object(
             bucket_name=self.bucket.name, key=unquote_plus(payload["Records"][0]["s3"]["object"]["key"])
         )
@@ -0,0 +1,132 @@
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from threading import Condition, Thread
+from time import monotonic, sleep
+from typing import List, Tuple, Union
+from .sqs import SQSBatchEntryError, SQSMessage, SQSQueue
+
+
+class SQSAckBuffer:
+    """Collect processed messages and delete them with delete_message_batch
+
+    A batch is sent once it holds 10 receipt handles or flush_interval seconds after its first one.
+    ack() returns a Future resolved once the message is deleted. Entries that failed on the server side
+    are retried alone, at most max_retries times, other failures (e.g. an expired receipt handle) fail
+    their future with SQSBatchEntryError and are kept in failures. close() deletes what is still buffered.
+
+    >>> with SQSAckBuffer(queue) as acks:
+    ...     for message in queue.receive_message_batch(100):
+    ...         process(message)
+    ...         acks.ack(message)
+    """
+
+    def __init__(
+        self,
+        queue: SQSQueue,
+        flush_interval: float = 1.0,
+        max_workers: int = 2,
+        max_retries: int = 3,
+        retry_delay: float = 0.1,
+    ):
+        self.queue = queue
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.deleted = 0
+        self.failures: List[Tuple[str, SQSBatchEntryError]] = []
+        self._buffer: List[Tuple[str, Future]] = []
+        self._buffer_started = 0.0
+        self._in_flight = set()
+        self._closed = False
+        self._condition = Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._timer = Thread(target=self._flush_on_time, daemon=True)
+        self._timer.start()
+
+    def __enter__(self) -> "SQSAckBuffer":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def ack(self, message: Union[SQSMessage, str]) -> "Future[None]":
+        """Schedule the deletion of a message or receipt handle"""
+        receipt_handle = message.receipt_handle if isinstance(message, SQSMessage) else message
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("SQSAckBuffer is closed")
+            if not self._buffer:
+                self._buffer_started = monotonic()
+                self._condition.notify()
+            self._buffer.append((receipt_handle, future))
+            if len(self._buffer) == 10:
+                self._submit()
+        return future
+
+    def flush(self):
+        """Send the buffered receipt handles and wait for every batch sent so far"""
+        with self._condition:
+            self._submit()
+            in_flight = list(self._in_flight)
+        wait(in_flight)
+
+    def close(self):
+        self.flush()
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._timer.join()
+        self._executor.shutdown(wait=True)
+
+    def _submit(self):
+        """Hand the buffer to the executor, the condition lock must be held"""
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        task = self._executor.submit(self._delete_batch, batch)
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    def _flush_on_time(self):
+        with self._condition:
+            while not self._closed:
+                if not self._buffer:
+                    self._condition.wait()
+                    continue
+                remaining = self._buffer_started + self.flush_interval - monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                else:
+                    self._submit()
+
+    def _fail(self, receipt_handle: str, future: Future, error: Exception):
+        with self._condition:
+            self.failures.append((receipt_handle, error))
+        future.set_exception(error)
+
+    def _delete_batch(self, batch: List[Tuple[str, Future]]):
+        pending = batch
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                sleep(self.retry_delay * 2 ** (attempt - 1))
+            try:
+                response = self.queue.delete_message_batch([receipt_handle for receipt_handle, _ in pending])
+            except Exception as e:
+                if attempt == self.max_retries:
+                    for receipt_handle, future in pending:
+                        self._fail(receipt_handle, future, e)
+                continue
+            for success in response["Successful"]:
+                pending[int(success["Id"])][1].set_result(None)
+            with self._condition:
+                self.deleted += len(response["Successful"])
+            retry = []
+            for failure in response["Failed"]:
+                receipt_handle, future = pending[int(failure["Id"])]
+                if failure.get("SenderFault") or attempt == self.max_retries:
+                    self._fail(receipt_handle, future, SQSBatchEntryError(failure))
+                else:
+                    retry.append((receipt_handle, future))
+            if not retry:
+                return
+            pending = retry
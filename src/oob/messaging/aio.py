@@ -0,0 +1,270 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from time import monotonic
+from typing import Dict, List
+from weakref import WeakKeyDictionary
+from botocore.config import Config
+from oob.utils import client_credentials, copy_client, underscore_namedtuple
+from .sns import SNSTopic, SNSTopicNotification
+from .sqs import SQSMessage, SQSQueue, SQSQueueFifo
+
+try:
+    from aiobotocore.config import AioConfig
+    from aiobotocore.credentials import AioDeferredRefreshableCredentials
+    from aiobotocore.session import get_session
+except ImportError:
+    get_session = None
+
+MAX_POOL_CONNECTIONS = 100
+
+
+class AsyncClient:
+    """Awaitable calls to the API of a boto3 client, on a pool of max_pool_connections connections
+
+    With aiobotocore installed the requests are sent by an aiobotocore client sharing the region, endpoint,
+    config and credentials of client, on the event loop itself, the client is then bound to that loop.
+    Otherwise every call runs on client, copied with a connection pool of max_pool_connections, in a pool
+    of as many threads: the event loop is never blocked but each request in flight holds a thread.
+    Temporary credentials (e.g. an assumed role) keep being refreshed by the provider of client.
+
+    >>> response = await AsyncClient(SQSBase.client).call("send_message", QueueUrl=url, MessageBody="Hello")
+    """
+
+    def __init__(self, client, max_pool_connections: int = MAX_POOL_CONNECTIONS):
+        self.client = client
+        self.max_pool_connections = max_pool_connections
+        self._config = client.meta.config.merge(Config(max_pool_connections=max_pool_connections))
+        self._options = dict(region_name=client.meta.region_name, endpoint_url=client.meta.endpoint_url)
+        self._service = client.meta.service_model.service_name
+        self._opening = None
+        self._context = None
+        self._aio_client = None
+        self._executor = None
+        self._pooled_client = None
+
+    async def _open(self):
+        config = AioConfig().merge(self._config)
+        options = dict(self._options, **client_credentials(self.client))
+        self._context = get_session().create_client(self._service, config=config, **options)
+        self._aio_client = await self._context.__aenter__()
+        credentials = self.client._get_credentials()
+        if hasattr(credentials, "refresh_needed"):
+            self._aio_client._request_signer._credentials = AioDeferredRefreshableCredentials(
+                partial(self._refresh_credentials, credentials), credentials.method
+            )
+
+    @staticmethod
+    async def _refresh_credentials(credentials) -> Dict:
+        """Credentials metadata of a botocore RefreshableCredentials, refreshed in a thread when needed"""
+        frozen = await asyncio.get_running_loop().run_in_executor(None, credentials.get_frozen_credentials)
+        return dict(
+            access_key=frozen.access_key,
+            secret_key=frozen.secret_key,
+            token=frozen.token,
+            expiry_time=credentials._expiry_time.isoformat(),
+        )
+
+    async def call(self, operation: str, **kwargs) -> Dict:
+        if get_session is None:
+            if self._executor is None:
+                self._pooled_client = copy_client(self.client, config=self._config)
+                self._executor = ThreadPoolExecutor(max_workers=self.max_pool_connections)
+            method = getattr(self._pooled_client, operation)
+            return await asyncio.get_running_loop().run_in_executor(self._executor, partial(method, **kwargs))
+        if self._opening is None:
+            self._opening = asyncio.ensure_future(self._open())
+        await self._opening
+        return await getattr(self._aio_client, operation)(**kwargs)
+
+    async def close(self):
+        if self._context is not None:
+            await self._context.__aexit__(None, None, None)
+            self._context = self._aio_client = self._opening = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = self._pooled_client = None
+
+
+_clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, AsyncClient]]" = WeakKeyDictionary()
+
+
+def async_client(client) -> AsyncClient:
+    """AsyncClient shared by every async object of the running event loop using client"""
+    clients = _clients.setdefault(asyncio.get_running_loop(), {})
+    service = client.meta.service_model.service_name
+    if service not in clients or clients[service].client is not client:
+        clients[service] = AsyncClient(client)
+    return clients[service]
+
+
+async def close_clients():
+    """Close the shared connection pools of the running event loop, to call before it is closed"""
+    clients = _clients.pop(asyncio.get_running_loop(), {})
+    for aclient in clients.values():
+        await aclient.close()
+
+
+@dataclass
+class AsyncSQSMessage(SQSMessage):
+    """SQSMessage whose API calls are coroutines"""
+
+    async def change_visibility(self, visibility_timeout: int) -> Dict:
+        return await async_client(self.client).call(
+            "change_message_visibility",
+            QueueUrl=self.queue_url,
+            ReceiptHandle=self.receipt_handle,
+            VisibilityTimeout=visibility_timeout,
+        )
+
+    async def delete(self) -> Dict:
+        return await async_client(self.client).call(
+            "delete_message", QueueUrl=self.queue_url, ReceiptHandle=self.receipt_handle
+        )
+
+    async def send(self, delay: int = None) -> Dict:
+        return self._sent(await async_client(self.client).call("send_message", **self._send_request(delay)))
+
+
+@dataclass
+class AsyncSQSQueue(SQSQueue):
+    """SQSQueue whose API calls are coroutines, created with create() which resolves the queue url
+
+    Batch requests of more than 10 entries send their requests concurrently. The blocking attributes
+    and number_of_messages properties are replaced by get_attributes() and get_number_of_messages().
+
+    >>> queue = await AsyncSQSQueue.create(name="my-queue", account="123456789012", region="eu-west-1")
+    >>> messages = await asyncio.gather(*(queue.send_message(body) for body in bodies))
+    """
+
+    def __post_init__(self):
+        self._set_names()
+
+    @classmethod
+    async def create(
+        cls, arn: str = None, region: str = None, account: str = None, name: str = None
+    ) -> "AsyncSQSQueue":
+        queue = cls(arn=arn, region=region, account=account, name=name)
+        response = await async_client(cls.client).call(
+            "get_queue_url", QueueName=queue.name, QueueOwnerAWSAccountId=queue.account
+        )
+        queue.url = response.get("QueueUrl")
+        return queue
+
+    @property
+    def attributes(self):
+        raise TypeError("AsyncSQSQueue.attributes would block the event loop, use await get_attributes()")
+
+    @property
+    def number_of_messages(self):
+        raise TypeError(
+            "AsyncSQSQueue.number_of_messages would block the event loop, use await get_number_of_messages()"
+        )
+
+    async def get_attributes(self):
+        response = await async_client(self.client).call(
+            "get_queue_attributes", QueueUrl=self.url, AttributeNames=["All"]
+        )
+        return underscore_namedtuple("QueueAttributes", response["Attributes"])
+
+    async def get_number_of_messages(self) -> int:
+        return int((await self.get_attributes()).approximate_number_of_messages)
+
+    async def _receive(self, batch_size: int, visibility_timeout: int, wait_time: int) -> List[AsyncSQSMessage]:
+        request = self._receive_request(batch_size, visibility_timeout, wait_time)
+        response = await async_client(self.client).call("receive_message", **request)
+        return [AsyncSQSMessage.from_response(self.url, message) for message in response.get("Messages", [])]
+
+    async def receive_message_batch(
+        self, batch_size: int, visibility_timeout: int = None, wait_time: int = 1, timeout: float = None
+    ) -> List[AsyncSQSMessage]:
+        """Same stop conditions as SQSQueue.receive_message_batch, the long polls are sent one after another"""
+        deadline = monotonic() + timeout if timeout is not None else None
+        messages = []
+        while len(messages) < batch_size:
+            wait = min(wait_time, 20)
+            if deadline is not None:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    break
+                wait = min(wait, int(remaining))
+            missing = min(batch_size - len(messages), 10)
+            received = await self._receive(missing, visibility_timeout, wait)
+            messages.extend(received)
+            if not received:
+                break
+        return messages
+
+    async def receive_message(self, visibility_timeout: int = None, wait_time: int = 0) -> AsyncSQSMessage:
+        return (await self._receive(1, visibility_timeout, wait_time))[0]
+
+    async def send_message(self, body: str, message_attributes: Dict = {}, delay: int = None) -> AsyncSQSMessage:
+        message = AsyncSQSMessage(queue_url=self.url, body=body, message_attributes=message_attributes)
+        await message.send(delay)
+        return message
+
+    async def delete_message(self, receipt_handle: str) -> Dict:
+        return await async_client(self.client).call("delete_message", QueueUrl=self.url, ReceiptHandle=receipt_handle)
+
+    async def _batch_request(self, operation: str, entries: List[Dict]) -> Dict:
+        aclient = async_client(self.client)
+        requests = [aclient.call(operation, QueueUrl=self.url, Entries=batch) for batch in self._batches(entries)]
+        return self._merge(await asyncio.gather(*requests))
+
+    async def delete_message_batch(self, receipt_handle_list: List[str]) -> Dict:
+        return await self._batch_request("delete_message_batch", [dict(ReceiptHandle=h) for h in receipt_handle_list])
+
+    async def purge(self) -> Dict:
+        return await async_client(self.client).call("purge_queue", QueueUrl=self.url)
+
+    async def change_message_visibility(self, receipt_handle: str, visibility_timeout: int) -> Dict:
+        return await async_client(self.client).call(
+            "change_message_visibility",
+            QueueUrl=self.url,
+            ReceiptHandle=receipt_handle,
+            VisibilityTimeout=visibility_timeout,
+        )
+
+    async def change_message_visibility_batch(self, receipt_handle_list: List[str], visibility_timeout: int) -> Dict:
+        entries = [dict(ReceiptHandle=h, VisibilityTimeout=visibility_timeout) for h in receipt_handle_list]
+        return await self._batch_request("change_message_visibility_batch", entries)
+
+
+@dataclass
+class AsyncSQSQueueFifo(AsyncSQSQueue, SQSQueueFifo):
+    async def send_message(
+        self, body: str, message_group_id: str, message_attributes: Dict = {}, delay: int = None
+    ) -> AsyncSQSMessage:
+        message = AsyncSQSMessage(
+            queue_url=self.url, body=body, message_attributes=message_attributes, group_id=message_group_id
+        )
+        await message.send(delay)
+        return message
+
+
+@dataclass
+class AsyncSNSTopic(SNSTopic):
+    """SNSTopic whose publish is a coroutine, created with create() which reads the topic attributes"""
+
+    def __post_init__(self):
+        self.attributes = None
+
+    @classmethod
+    async def create(cls, arn: str = None, phone: str = None) -> "AsyncSNSTopic":
+        topic = cls(arn=arn, phone=phone)
+        response = await async_client(cls.client).call("get_topic_attributes", TopicArn=arn) if arn else {}
+        topic.attributes = underscore_namedtuple("SNSTopic", response.get("Attributes", {}))
+        return topic
+
+    async def publish(self, message: str, subject: str = None, structure: str = "text", attributes: Dict = None) -> str:
+        request = self._publish_request(message, subject, structure, attributes)
+        return (await async_client(self.client).call("publish", **request))["MessageId"]
+
+
+@dataclass
+class AsyncSNSTopicNotification(SNSTopicNotification):
+    """SNSTopicNotification whose publish is a coroutine"""
+
+    async def publish(self) -> str:
+        return (await async_client(self.client).call("publish", **self._publish_request()))["MessageId"]
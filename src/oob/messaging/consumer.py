@@ -0,0 +1,175 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event, Lock, Semaphore, Thread
+from typing import Callable, Dict, List
+from .ack import SQSAckBuffer
+from .sqs import SQSMessage, SQSQueue
+
+logger = logging.getLogger(__name__)
+
+
+class SQSConsumer:
+    """Process the messages of a queue with a pool of worker threads
+
+    pollers threads long poll the queue and hand the messages to max_workers workers calling handler,
+    at most max_workers + prefetch messages are received and not yet processed. While a message is
+    being processed its visibility timeout is extended every heartbeat_interval seconds by
+    change_message_visibility_batch. Messages handled without exception are deleted by an SQSAckBuffer
+    flushed every delete_interval seconds, a failed message stops being extended and becomes visible
+    again after its visibility timeout.
+
+    >>> with SQSConsumer(queue, handle, max_workers=16) as consumer:
+    ...     consumer.wait()
+    """
+
+    def __init__(
+        self,
+        queue: SQSQueue,
+        handler: Callable[[SQSMessage], None],
+        max_workers: int = 8,
+        pollers: int = 1,
+        prefetch: int = None,
+        visibility_timeout: int = 30,
+        heartbeat_interval: float = None,
+        wait_time: int = 20,
+        delete_interval: float = 1.0,
+    ):
+        self.queue = queue
+        self.handler = handler
+        self.max_workers = max_workers
+        self.pollers = pollers
+        self.visibility_timeout = visibility_timeout
+        self.heartbeat_interval = heartbeat_interval if heartbeat_interval else visibility_timeout / 3
+        self.wait_time = wait_time
+        self.delete_interval = delete_interval
+        self.processed = 0
+        self.failed = 0
+        self._slots = Semaphore(max_workers + (prefetch if prefetch is not None else max_workers))
+        self._in_flight: Dict[str, SQSMessage] = {}
+        self._acks = None
+        self._lock = Lock()
+        self._stopping = Event()
+        self._stopped = Event()
+        self._executor = None
+        self._threads: List[Thread] = []
+
+    def __enter__(self) -> "SQSConsumer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self) -> "SQSConsumer":
+        self._stopping.clear()
+        self._stopped.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self._acks = SQSAckBuffer(self.queue, flush_interval=self.delete_interval)
+        self._threads = [Thread(target=self._poll, daemon=True) for _ in range(self.pollers)]
+        self._threads.append(Thread(target=self._heartbeat, daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self, timeout: float = None):
+        """Stop receiving, let the workers finish the messages already received and delete them
+
+        A long poll still running after timeout is not waited for, the messages it receives are made
+        visible again.
+        """
+        self._stopping.set()
+        for thread in self._threads[: self.pollers]:
+            thread.join(timeout)
+        with self._lock:  # pollers check _stopping and submit under the lock, none submits past this point
+            self._executor.shutdown(wait=False)
+        self._executor.shutdown(wait=True)
+        self._stopped.set()
+        self._threads[-1].join(timeout)
+        self._acks.close()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Block until stop() is called from another thread or timeout seconds are elapsed"""
+        return self._stopped.wait(timeout)
+
+    def _acquire(self, count: int) -> int:
+        """Reserve up to count slots, waiting for the first one, returns the number reserved"""
+        while not self._slots.acquire(timeout=0.1):
+            if self._stopping.is_set():
+                return 0
+        acquired = 1
+        while acquired < count and self._slots.acquire(blocking=False):
+            acquired += 1
+        return acquired
+
+    def _poll(self):
+        while not self._stopping.is_set():
+            slots = self._acquire(10)
+            if not slots:
+                return
+            try:
+                request = self.queue._receive_request(slots, self.visibility_timeout, self.wait_time)
+                response = self.queue.client.receive_message(**request)
+                messages = [SQSMessage.from_response(self.queue.url, m) for m in response.get("Messages", [])]
+            except Exception:
+                logger.exception("receive_message failed on %s", self.queue.url)
+                messages = []
+                self._stopping.wait(1)
+            for _ in range(slots - len(messages)):
+                self._slots.release()
+            with self._lock:
+                stopping = self._stopping.is_set()
+                for message in [] if stopping else messages:
+                    self._in_flight[message.receipt_handle] = message
+                    self._executor.submit(self._process, message)
+            if stopping:
+                self._release(messages)
+
+    def _release(self, messages: List[SQSMessage]):
+        """Make messages received once stop() was called visible again and free their slots"""
+        for _ in messages:
+            self._slots.release()
+        if not messages:
+            return
+        try:
+            response = self.queue.change_message_visibility_batch([m.receipt_handle for m in messages], 0)
+        except Exception:
+            logger.exception("change_message_visibility_batch failed on %s", self.queue.url)
+            return
+        for failure in response["Failed"]:
+            logger.warning("could not release message on %s: %s", self.queue.url, failure.get("Message"))
+
+    def _process(self, message: SQSMessage):
+        try:
+            self.handler(message)
+        except Exception:
+            logger.exception("handler failed on message %s", message.id)
+            with self._lock:
+                self._in_flight.pop(message.receipt_handle, None)
+                self.failed += 1
+        else:
+            with self._lock:
+                self._in_flight.pop(message.receipt_handle, None)
+                self.processed += 1
+            self._acks.ack(message).add_done_callback(self._log_ack_failure)
+        finally:
+            self._slots.release()
+
+    def _log_ack_failure(self, future):
+        if future.exception():
+            logger.warning("could not delete message from %s: %s", self.queue.url, future.exception())
+
+    def _extend_visibility(self):
+        with self._lock:
+            receipt_handles = list(self._in_flight)
+        if not receipt_handles:
+            return
+        try:
+            response = self.queue.change_message_visibility_batch(receipt_handles, self.visibility_timeout)
+        except Exception:
+            logger.exception("change_message_visibility_batch failed on %s", self.queue.url)
+            return
+        for failure in response["Failed"]:
+            logger.warning("could not extend visibility on %s: %s", self.queue.url, failure.get("Message"))
+
+    def _heartbeat(self):
+        while not self._stopped.wait(self.heartbeat_interval):
+            self._extend_visibility()
@@ -0,0 +1,179 @@
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from threading import Condition, Thread
+from time import monotonic, sleep
+from typing import Dict, List, Tuple
+from .sqs import SQSBatchEntryError, SQSMessage, SQSQueue
+
+MAX_BATCH_ENTRIES = 10
+MAX_BATCH_BYTES = 256 * 1024
+
+
+def entry_size(entry: Dict) -> int:
+    """Payload size counted by SQS: body plus attribute names, types and values"""
+    size = len(entry["MessageBody"].encode())
+    for name, attribute in entry.get("MessageAttributes", {}).items():
+        value = attribute.get("StringValue", attribute.get("BinaryValue", b""))
+        size += len(name.encode()) + len(attribute["DataType"].encode())
+        size += len(value) if isinstance(value, bytes) else len(value.encode())
+    return size
+
+
+class SQSProducer:
+    """Thread-safe producer sending buffered messages with send_message_batch
+
+    A batch is sent once it holds 10 messages, when the next message would take it over the 256 KB
+    payload limit, or linger seconds after its first message. send() returns a Future resolved with the
+    sent SQSMessage (id, body_md5, sequence_number). Entries that failed on the server side are retried
+    alone, at most max_retries times, sender faults fail their future with SQSBatchEntryError.
+    Batches are sent by max_workers threads, messages of different batches are not ordered. On a FIFO
+    queue (name ending with .fifo) send() requires a group_id and the batches are sent one at a time,
+    in order, each one with its retries. A failed entry is retried only if no later entry of its group
+    was accepted, otherwise it fails, so the messages accepted in every group keep the order of send().
+
+    >>> with SQSProducer(queue) as producer:
+    ...     futures = [producer.send(json.dumps(record)) for record in records]
+    >>> ids = [f.result().id for f in futures]
+    """
+
+    def __init__(
+        self,
+        queue: SQSQueue,
+        linger: float = 0.05,
+        max_workers: int = 4,
+        max_retries: int = 3,
+        retry_delay: float = 0.1,
+    ):
+        self.queue = queue
+        self.linger = linger
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.batches = 0
+        self.fifo = queue.url.endswith(".fifo")
+        self._buffer: List[Tuple[Dict, Future, SQSMessage]] = []
+        self._buffer_bytes = 0
+        self._buffer_started = 0.0
+        self._in_flight = set()
+        self._closed = False
+        self._condition = Condition()
+        self._executor = ThreadPoolExecutor(max_workers=1 if self.fifo else max_workers)
+        self._linger_thread = Thread(target=self._linger, daemon=True)
+        self._linger_thread.start()
+
+    def __enter__(self) -> "SQSProducer":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def send(
+        self,
+        body: str,
+        message_attributes: Dict = None,
+        delay: int = None,
+        group_id: str = None,
+        deduplication_id: str = None,
+    ) -> "Future[SQSMessage]":
+        if self.fifo != bool(group_id):
+            raise ValueError("group_id is required by FIFO queues and only accepted by them")
+        message = SQSMessage(
+            queue_url=self.queue.url, body=body, message_attributes=message_attributes, group_id=group_id
+        )
+        entry = {"MessageBody": body}
+        if message.message_attributes_schema:
+            entry["MessageAttributes"] = message.message_attributes_schema
+        if group_id:
+            entry["MessageGroupId"] = group_id
+        if deduplication_id:
+            entry["MessageDeduplicationId"] = deduplication_id
+        if delay:
+            entry["DelaySeconds"] = delay
+        size = entry_size(entry)
+        if size > MAX_BATCH_BYTES:
+            raise ValueError(f"message of {size} bytes is over the {MAX_BATCH_BYTES} bytes SQS limit")
+        future = Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("SQSProducer is closed")
+            if self._buffer and self._buffer_bytes + size > MAX_BATCH_BYTES:
+                self._submit()
+            if not self._buffer:
+                self._buffer_started = monotonic()
+                self._condition.notify()
+            self._buffer.append((entry, future, message))
+            self._buffer_bytes += size
+            if len(self._buffer) == MAX_BATCH_ENTRIES:
+                self._submit()
+        return future
+
+    def flush(self):
+        """Send the buffered messages and wait for every batch sent so far"""
+        with self._condition:
+            self._submit()
+            in_flight = list(self._in_flight)
+        wait(in_flight)
+
+    def close(self):
+        self.flush()
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._linger_thread.join()
+        self._executor.shutdown(wait=True)
+
+    def _submit(self):
+        """Hand the buffer to the executor, the condition lock must be held"""
+        if not self._buffer:
+            return
+        batch, self._buffer, self._buffer_bytes = self._buffer, [], 0
+        self.batches += 1
+        task = self._executor.submit(self._send_batch, batch)
+        self._in_flight.add(task)
+        task.add_done_callback(self._in_flight.discard)
+
+    def _linger(self):
+        with self._condition:
+            while not self._closed:
+                if not self._buffer:
+                    self._condition.wait()
+                    continue
+                remaining = self._buffer_started + self.linger - monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                else:
+                    self._submit()
+
+    def _send_batch(self, batch: List[Tuple[Dict, Future, SQSMessage]]):
+        pending = batch
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                sleep(self.retry_delay * 2 ** (attempt - 1))
+            entries = [dict(entry, Id=str(i)) for i, (entry, _, _) in enumerate(pending)]
+            try:
+                response = self.queue.client.send_message_batch(QueueUrl=self.queue.url, Entries=entries)
+            except Exception as e:
+                if attempt == self.max_retries:
+                    for _, future, _ in pending:
+                        future.set_exception(e)
+                continue
+            for success in response.get("Successful", []):
+                _, future, message = pending[int(success["Id"])]
+                message.id = success["MessageId"]
+                message.body_md5 = success["MD5OfMessageBody"]
+                message.sequence_number = success.get("SequenceNumber", None)
+                future.set_result(message)
+            last_sent = {}
+            if self.fifo:
+                for success in response.get("Successful", []):
+                    group_id = pending[int(success["Id"])][0]["MessageGroupId"]
+                    last_sent[group_id] = max(last_sent.get(group_id, -1), int(success["Id"]))
+            retry = []
+            for failure in sorted(response.get("Failed", []), key=lambda f: int(f["Id"])):
+                item = pending[int(failure["Id"])]
+                overtaken = last_sent.get(item[0].get("MessageGroupId"), -1) > int(failure["Id"])
+                if failure.get("SenderFault") or overtaken or attempt == self.max_retries:
+                    item[1].set_exception(SQSBatchEntryError(failure))
+                else:
+                    retry.append(item)
+            if not retry:
+                return
+            pending = retry
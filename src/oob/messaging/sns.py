@@ -51,7 +51,9 @@ class SNSTopic(SNSBase):
             "SNSTopic", self.client.get_topic_attributes(TopicArn=self.arn).get("Attributes", {})
         )
 
-    def publish(self, message: str, subject: str = None, structure: str = "text", attributes: Dict = None) -> str:
+    def _publish_request(
+        self, message: str, subject: str = None, structure: str = "text", attributes: Dict = None
+    ) -> Dict:
         payload = dict(Message=message)
         if self.arn:
             payload["TopicArn"] = self.arn
@@ -65,7 +67,10 @@ class SNSTopic(SNSBase):
             payload["MessageAttributes"] = attributes
         if structure == "json":
             payload["MessageStructure"] = "json"
-        return self.client.publish(**payload)["MessageId"]
+        return payload
+
+    def publish(self, message: str, subject: str = None, structure: str = "text", attributes: Dict = None) -> str:
+        return self.client.publish(**self._publish_request(message, subject, structure, attributes))["MessageId"]
 
 
 @dataclass
@@ -92,7 +97,7 @@ class SNSTopicNotification(SNSNotification):
         if not self.topic_arn:
             raise ValueError("topic_arn must be defined and not None.")
 
-    def publish(self) -> str:
+    def _publish_request(self) -> Dict:
         payload = dict(TopicArn=self.topic_arn, Message=self.message)
         if self.subject:
             payload["Subject"] = self.subject
@@ -100,4 +105,7 @@ class SNSTopicNotification(SNSNotification):
             payload["MessageAttributes"] = self.message_attributes_schema
         if self.structure == "json":
             payload["MessageStructure"] = "json"
-        return self.client.publish(**payload)["MessageId"]
+        return payload
+
+    def publish(self) -> str:
+        return self.client.publish(**self._publish_request())["MessageId"]
@@ -1,10 +1,21 @@
 from dataclasses import dataclass, InitVar, field, asdict
+from time import monotonic
 from typing import ClassVar, List, Dict, Tuple, Generator
 from boto3 import client, Session
 from oob.utils import underscore_namedtuple
 from . import MessageAttribute
 
 
+class SQSBatchEntryError(Exception):
+    """Failed entry of a SQS batch request"""
+
+    def __init__(self, entry: Dict):
+        super().__init__(f"{entry.get('Code')}: {entry.get('Message')}")
+        self.code = entry.get("Code")
+        self.sender_fault = entry.get("SenderFault", False)
+        self.entry = entry
+
+
 @dataclass
 class SQSBase:
     client: ClassVar[Session] = client("sqs")
@@ -54,18 +65,37 @@ class SQSMessage(SQSBase):
     def delete(self) -> Dict:
         return self.client.delete_message(QueueUrl=self.queue_url, ReceiptHandle=self.receipt_handle)
 
-    def send(self, delay: int = None) -> Dict:
+    @classmethod
+    def from_response(cls, queue_url: str, message: Dict) -> "SQSMessage":
+        """Message of a receive_message response"""
+        return cls(
+            body=message.get("Body", None),
+            body_md5=message.get("MD5OfBody", None),
+            region=message.get("Region", None),
+            attributes=underscore_namedtuple("Attributes", message.get("Attributes", {})),
+            message_attributes_schema=message.get("MessageAttributes", {}),
+            queue_url=queue_url,
+            id=message.get("MessageId", None),
+            receipt_handle=message.get("ReceiptHandle", None),
+        )
+
+    def _send_request(self, delay: int = None) -> Dict:
         payload = dict(QueueUrl=self.queue_url, MessageBody=self.body, MessageAttributes=self.message_attributes_schema)
         if self.group_id:
             payload["MessageGroupId"] = self.group_id
         if delay:
             payload["DelaySeconds"] = delay
-        response = self.client.send_message(**payload)
+        return payload
+
+    def _sent(self, response: Dict) -> Dict:
         self.id = response["MessageId"]
         self.body_md5 = response["MD5OfMessageBody"]
         self.sequence_number = response.get("SequenceNumber", None)
         return response
 
+    def send(self, delay: int = None) -> Dict:
+        return self._sent(self.client.send_message(**self._send_request(delay)))
+
 
 @dataclass
 class SQSQueue(SQSBase):
@@ -76,6 +106,10 @@ class SQSQueue(SQSBase):
     name: str = None
 
     def __post_init__(self):
+        self._set_names()
+        self.url = self.client.get_queue_url(QueueName=self.name, QueueOwnerAWSAccountId=self.account).get("QueueUrl")
+
+    def _set_names(self):
         arn = self.arn
         region = self.region
         account = self.account
@@ -88,8 +122,6 @@ class SQSQueue(SQSBase):
         else:
             self.arn = f"arn:aws:sqs:{region}:{account}:{name}"
 
-        self.url = self.client.get_queue_url(QueueName=self.name, QueueOwnerAWSAccountId=self.account).get("QueueUrl")
-
     @property
     def attributes(self) -> Dict:
         response = self.client.get_queue_attributes(QueueUrl=self.url, AttributeNames=["All"])
@@ -99,9 +131,7 @@ class SQSQueue(SQSBase):
     def number_of_messages(self) -> int:
         return int(self.attributes.approximate_number_of_messages)
 
-    def __receive_message(
-        self, batch_size: int, visibility_timeout: int, wait_time: int
-    ) -> Generator[SQSMessage, None, None]:
+    def _receive_request(self, batch_size: int, visibility_timeout: int, wait_time: int) -> Dict:
         request_arguments = {
             "QueueUrl": self.url,
             "AttributeNames": ["All"],
@@ -111,27 +141,37 @@ class SQSQueue(SQSBase):
         }
         if visibility_timeout:
             request_arguments["VisibilityTimeout"] = visibility_timeout
-        response = self.client.receive_message(**request_arguments)
-        for message in response["Messages"]:
-            yield SQSMessage(
-                body=message.get("Body", None),
-                body_md5=message.get("MD5OfBody", None),
-                region=message.get("Region", None),
-                attributes=underscore_namedtuple("Attributes", message.get("Attributes", {})),
-                message_attributes_schema=message.get("MessageAttributes", {}),
-                queue_url=self.url,
-                id=message.get("MessageId", None),
-                receipt_handle=message.get("ReceiptHandle", None),
-            )
+        return request_arguments
+
+    def __receive_message(
+        self, batch_size: int, visibility_timeout: int, wait_time: int
+    ) -> Generator[SQSMessage, None, None]:
+        response = self.client.receive_message(**self._receive_request(batch_size, visibility_timeout, wait_time))
+        for message in response.get("Messages", []):
+            yield SQSMessage.from_response(self.url, message)
 
     def receive_message_batch(
-        self, batch_size: int, visibility_timeout: int = None, wait_time: int = 0
+        self, batch_size: int, visibility_timeout: int = None, wait_time: int = 1, timeout: float = None
     ) -> List[SQSMessage]:
-        number_of_messages = int(self.number_of_messages)
+        """Receive up to batch_size messages with requests of 10, long polling wait_time seconds (at most 20)
+
+        A long poll returns as soon as some messages are available, requests are sent until batch_size
+        messages are received, a request returns no message or timeout seconds are elapsed.
+        """
+        deadline = monotonic() + timeout if timeout is not None else None
         messages = []
-        while len(messages) < min(batch_size, number_of_messages):
+        while len(messages) < batch_size:
+            wait = min(wait_time, 20)
+            if deadline is not None:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    break
+                wait = min(wait, int(remaining))
             missing = min(batch_size - len(messages), 10)
-            messages.extend(list(self.__receive_message(missing, visibility_timeout, wait_time)))
+            received = list(self.__receive_message(missing, visibility_timeout, wait))
+            messages.extend(received)
+            if not received:
+                break
         return messages
 
     def receive_message(self, visibility_timeout: int = None, wait_time: int = 0) -> SQSMessage:
@@ -145,20 +185,30 @@ class SQSQueue(SQSBase):
     def delete_message(self, receipt_handle: str) -> Dict:
         return self.client.delete_message(QueueUrl=self.url, ReceiptHandle=receipt_handle)
 
-    def delete_message_batch(self, receipt_handle_list: List[str]) -> Dict:
-        response = {}
-        for batch_no in range(0, len(receipt_handle_list), 10):
-            response.update(
-                self.client.delete_message_batch(
-                    QueueUrl=self.url,
-                    Entries=[
-                        dict(Id=str(i), ReceiptHandle=m)
-                        for i, m in enumerate(receipt_handle_list[batch_no : batch_no + 10])
-                    ],
-                )
-            )
+    @staticmethod
+    def _batches(entries: List[Dict]) -> Generator[List[Dict], None, None]:
+        """Entries by requests of 10, Ids are the entries indexes"""
+        for batch_no in range(0, len(entries), 10):
+            yield [dict(entry, Id=str(i)) for i, entry in enumerate(entries[batch_no : batch_no + 10], batch_no)]
+
+    @staticmethod
+    def _merge(responses: List[Dict]) -> Dict:
+        """Successful and Failed of every request"""
+        response = {"Successful": [], "Failed": []}
+        for chunk in responses:
+            response["Successful"].extend(chunk.get("Successful", []))
+            response["Failed"].extend(chunk.get("Failed", []))
         return response
 
+    def _batch_request(self, operation: str, entries: List[Dict]) -> Dict:
+        return self._merge(
+            [getattr(self.client, operation)(QueueUrl=self.url, Entries=batch) for batch in self._batches(entries)]
+        )
+
+    def delete_message_batch(self, receipt_handle_list: List[str]) -> Dict:
+        """Delete by batches of 10, Failed lists the failures of every batch with the receipt_handle_list index as Id"""
+        return self._batch_request("delete_message_batch", [dict(ReceiptHandle=h) for h in receipt_handle_list])
+
     def purge(self) -> Dict:
         return self.client.purge_queue(QueueUrl=self.url)
 
@@ -168,18 +218,8 @@ class SQSQueue(SQSBase):
         )
 
     def change_message_visibility_batch(self, receipt_handle_list: List[str], visibility_timeout: int) -> Dict:
-        response = {}
-        for batch_no in range(0, len(receipt_handle_list), 10):
-            response.update(
-                self.client.change_message_visibility_batch(
-                    QueueUrl=self.url,
-                    Entries=[
-                        dict(Id=str(i), ReceiptHandle=m, VisibilityTimeout=visibility_timeout)
-                        for i, m in enumerate(receipt_handle_list[batch_no : batch_no + 10])
-                    ],
-                )
-            )
-        return response
+        entries = [dict(ReceiptHandle=h, VisibilityTimeout=visibility_timeout) for h in receipt_handle_list]
+        return self._batch_request("change_message_visibility_batch", entries)
 
 
 @dataclass
@@ -131,7 +131,7 @@ class MySQL:
         columns=None,
     ):
         s3_url = f"s3://{s3object.bucket_name}/{s3object.key}"
-        file_obj = s3object.download_fileobj()
+        file_obj = s3object.open(readahead=2 if split_lines else 0)
         columns = Base._parse_header(file_obj, file_encoding, fields_delimiter, columns)
         statement = None
         if split_lines:
@@ -248,7 +248,7 @@ class PgSQL:
         extra_options={},
     ):
         s3_url = f"s3://{s3object.bucket_name}/{s3object.key}"
-        file_obj = s3object.download_fileobj()
+        file_obj = s3object.open(readahead=2 if split_lines else 0)
         columns = Base._parse_header(file_obj, file_encoding, fields_delimiter, columns)
         statement = None
         if split_lines:
@@ -1,20 +1,119 @@
-from typing import List, ClassVar, Tuple, Union, IO, Dict, Optional
+import os
+from typing import List, ClassVar, Tuple, Union, IO, Dict, Optional, Generator, Iterable, Callable
 from dataclasses import dataclass, InitVar, field, asdict
-from io import BytesIO
+from datetime import datetime, timedelta, timezone
+from io import BytesIO, BufferedReader, TextIOWrapper
+from shutil import copyfile, copyfileobj
+from threading import Lock
+from time import monotonic, sleep
 from boto3 import client, Session
-from oob.utils import underscore_namedtuple
+from botocore.exceptions import ClientError
+from oob.utils import underscore_namedtuple, chunked, bounded_imap, copy_client
+from .transfer import S3TransferProfile, S3TransferStats, S3ResumableUpload, track_transfer, copy_object, pooled_client
 
 
 @dataclass
 class S3Base:
     client: ClassVar[Session] = client("s3")
 
+    def _use_region(self, region: str):
+        """Send the requests through the client of region, see regional_client"""
+        regional = regional_client(region)
+        if regional is not S3Base.client:
+            self.client = regional
+
+    def _transfer_config(self, profile: S3TransferProfile = None):
+        profile = profile if profile else getattr(self, "transfer_profile", None)
+        return profile.config if profile else None
+
+
+@dataclass
+class S3DeleteSummary:
+    deleted: int = 0
+    batches: int = 0
+    retries: int = 0
+    errors: List[Dict] = field(default_factory=list)
+
+
+@dataclass
+class S3CopySummary:
+    copied: int = 0
+    bytes: int = 0
+    deleted: int = 0
+    errors: List[Tuple[str, Exception]] = field(default_factory=list)
+
+
+_bucket_regions: Dict[str, Tuple[str, float]] = {}
+
+
+def bucket_region(name: str, ttl: float = 3600) -> str:
+    """Region of bucket name, get_bucket_location answers are cached for ttl seconds by the process"""
+    cached = _bucket_regions.get(name)
+    if cached and monotonic() - cached[1] < ttl:
+        return cached[0]
+    location = S3Base.client.get_bucket_location(Bucket=name)["LocationConstraint"]
+    region = {None: "us-east-1", "": "us-east-1", "EU": "eu-west-1"}.get(location, location)
+    _bucket_regions[name] = (region, monotonic())
+    return region
+
+
+def clear_bucket_regions():
+    _bucket_regions.clear()
+
+
+def key_path(directory: str, key: str) -> str:
+    """Local path of key under directory, raises ValueError when the key (e.g. a/../../b) resolves outside of it"""
+    root = os.path.realpath(directory)
+    path = os.path.realpath(os.path.join(root, *key.split("/")))
+    if path == root or os.path.commonpath([root, path]) != root:
+        raise ValueError(f"key {key} resolves outside of {directory}")
+    return path
+
+
+_regional_clients: Dict[Tuple[int, str], Session] = {}
+_regional_clients_lock = Lock()
+
+
+def regional_client(region: str) -> Session:
+    """S3 client of region with its own connection pool, created once per process from S3Base.client
+
+    The copy signs with the credentials of S3Base.client. S3Base.client itself is returned for its own
+    region, for an unknown region and when it targets a custom endpoint (S3 compatible stores have no
+    regional endpoints).
+    """
+    default = S3Base.client
+    if not region or region == default.meta.region_name or "amazonaws.com" not in default.meta.endpoint_url:
+        return default
+    cache_key = (id(default), region)
+    with _regional_clients_lock:
+        if cache_key not in _regional_clients:
+            _regional_clients[cache_key] = copy_client(default, region_name=region, endpoint_url=None)
+        return _regional_clients[cache_key]
+
+
+@dataclass
+class S3DownloadEvent:
+    key: str
+    path: str = None
+    data: bytes = None
+    bytes: int = 0
+    error: Exception = None
+
 
 @dataclass
 class S3Bucket(S3Base):
+    """Bucket handle built from its name or arn
+
+    The region is resolved with get_bucket_location and cached by the process for region_ttl seconds.
+    Passing region (e.g. the awsRegion of an event record) or resolve_region=False sends no request.
+    """
+
     arn: str = None
     name: str = None
     region: str = None
+    transfer_profile: S3TransferProfile = field(default=None, repr=False)
+    resolve_region: bool = field(default=True, repr=False)
+    region_ttl: ClassVar[float] = 3600
     __list_keys_args: Dict = field(init=False, default_factory=dict, repr=False)
 
     def __post_init__(self):
@@ -28,28 +127,127 @@ class S3Bucket(S3Base):
         else:
             self.arn = f"arn:aws:s3:::{name}"
 
-        self.region = self.client.get_bucket_location(Bucket=self.name)["LocationConstraint"]
+        if self.region:
+            _bucket_regions[self.name] = (self.region, monotonic())
+        elif self.resolve_region:
+            self.region = bucket_region(self.name, self.region_ttl)
+        self._use_region(self.region)
 
     def head(self):
         self.client.head_bucket(Bucket=self.name)
 
     def upload_file(
-        self, file: Union[str, IO[bytes]], dest: str, consistent_write=True, wait_delay: int = 5
+        self,
+        file: Union[str, IO[bytes]],
+        dest: str,
+        consistent_write: Union[bool, str] = True,
+        wait_delay: int = 5,
+        wait_timeout: float = 60,
+        profile: S3TransferProfile = None,
+        callback: Callable[[S3TransferStats], None] = None,
+        checksum_algorithm: str = None,
     ) -> Optional["S3Object"]:
-        """Upload file/fileobj to destination, blocking option waits for the uploaded file to be available"""
-
-        if isinstance(file, str):
-            self.client.upload_file(file, self.name, dest)
-        else:
-            self.client.upload_fileobj(file, self.name, dest)
-
-        if consistent_write:
+        """Upload file/fileobj to destination and return the uploaded S3Object
+
+        consistent_write selects how the upload is confirmed:
+        True or "strong": no request, S3 provides strong read-after-write consistency
+        "verify": poll head_object with an exponential backoff for at most wait_timeout seconds,
+        for S3 compatible stores that are only eventually consistent
+        "waiter": object_exists waiter polling every wait_delay seconds
+        False: nothing is returned
+
+        profile overrides the bucket transfer_profile and callback receives the S3TransferStats of the upload.
+        checksum_algorithm (CRC32, CRC32C, SHA1, SHA256) has the checksum of every part computed while it is
+        sent and stored by S3, it can then be checked by S3Object.download_to(verify_checksum=True).
+        """
+        size = os.path.getsize(file) if isinstance(file, str) else None
+        config = self._transfer_config(profile)
+        extra_args = {"ChecksumAlgorithm": checksum_algorithm} if checksum_algorithm else None
+        with track_transfer(self.client, "upload", self.name, dest, size, callback) as stats:
+            if isinstance(file, str):
+                self.client.upload_file(file, self.name, dest, ExtraArgs=extra_args, Callback=stats, Config=config)
+            else:
+                self.client.upload_fileobj(file, self.name, dest, ExtraArgs=extra_args, Callback=stats, Config=config)
+
+        if consistent_write is True or consistent_write == "strong":
+            return S3Object(bucket_name=self.name, key=dest, size=size, transfer_profile=self.transfer_profile)
+        if consistent_write == "verify":
+            return S3Object(bucket_name=self.name, key=dest, head=self._wait_for_object(dest, wait_timeout))
+        if consistent_write == "waiter":
             waiter = self.client.get_waiter("object_exists")
             waiter.wait(Bucket=self.name, Key=dest, WaiterConfig={"Delay": wait_delay})
             return S3Object(bucket_name=self.name, key=dest)
+        if consistent_write:
+            raise ValueError(
+                f"consistent_write must be a boolean, 'strong', 'verify' or 'waiter', not {consistent_write}"
+            )
+
+    def upload_file_resumable(
+        self,
+        file: str,
+        dest: str,
+        part_size: int = 16 * 2**20,
+        max_workers: int = 8,
+        checkpoint: str = None,
+        checksum_algorithm: str = None,
+    ) -> "S3Object":
+        """Multipart upload recording completed parts in a checkpoint file, a retry only uploads missing parts"""
+        S3ResumableUpload(
+            self.client,
+            file,
+            self.name,
+            dest,
+            part_size=part_size,
+            max_workers=max_workers,
+            checkpoint=checkpoint,
+            checksum_algorithm=checksum_algorithm,
+        ).upload()
+        return S3Object(
+            bucket_name=self.name, key=dest, size=os.path.getsize(file), transfer_profile=self.transfer_profile
+        )
+
+    def abort_incomplete_uploads(self, prefix: str = "", older_than: timedelta = None) -> List[Dict]:
+        """Abort multipart uploads under prefix initiated more than older_than ago, returns the aborted uploads"""
+        limit = datetime.now(timezone.utc) - older_than if older_than else None
+        aborted = []
+        paginator = self.client.get_paginator("list_multipart_uploads")
+        for page in paginator.paginate(Bucket=self.name, Prefix=prefix):
+            for upload in page.get("Uploads", []):
+                if limit and upload["Initiated"] > limit:
+                    continue
+                self.client.abort_multipart_upload(Bucket=self.name, Key=upload["Key"], UploadId=upload["UploadId"])
+                aborted.append(upload)
+        return aborted
+
+    def _wait_for_object(self, key: str, timeout: float, delay: float = 0.05, max_delay: float = 5) -> Dict:
+        deadline = monotonic() + timeout
+        while True:
+            try:
+                return self.client.head_object(Bucket=self.name, Key=key)
+            except ClientError as e:
+                if e.response["Error"]["Code"] not in ("404", "NoSuchKey") or monotonic() + delay > deadline:
+                    raise
+            sleep(delay)
+            delay = min(delay * 2, max_delay)
+
+    def sync_from(
+        self, local_dir: str, prefix: str = "", delete: bool = False, max_workers: int = 8, checksum: bool = False
+    ) -> "S3SyncSummary":
+        """Upload files of local_dir that are missing or changed under prefix"""
+        from .sync import S3Sync
+
+        return S3Sync(self, local_dir, prefix, delete, max_workers, checksum).upload()
+
+    def sync_to(
+        self, local_dir: str, prefix: str = "", delete: bool = False, max_workers: int = 8, checksum: bool = False
+    ) -> "S3SyncSummary":
+        """Download objects under prefix that are missing or changed in local_dir"""
+        from .sync import S3Sync
+
+        return S3Sync(self, local_dir, prefix, delete, max_workers, checksum).download()
 
     def get_object(self, object_key):
-        return S3Object(bucket_name=self.name, key=object_key)
+        return S3Object(bucket_name=self.name, key=object_key, transfer_profile=self.transfer_profile)
 
     def _list_keys(self, list_keys_args, max_keys):
         response = self.client.list_objects_v2(**list_keys_args)
@@ -77,22 +275,243 @@ class S3Bucket(S3Base):
     def list_keys_paginator(self, prefix="", max_keys: int = 1000):
         return iter(S3BucketPaginator(self, prefix, max_keys))
 
-    def delete_object(self, key):
-        return self.client.delete_object(Bucket=self.name, Key=key)
+    def _iter_pages(self, list_keys_args: Dict) -> Generator[Dict, None, None]:
+        list_keys_args = dict(list_keys_args)
+        while True:
+            response = self.client.list_objects_v2(**list_keys_args)
+            yield response
+            if "NextContinuationToken" not in response:
+                return
+            list_keys_args["ContinuationToken"] = response["NextContinuationToken"]
+
+    def iter_objects(
+        self, prefix="", max_keys: int = None, page_size: int = 1000, start_after: str = None
+    ) -> Generator["S3Object", None, None]:
+        """Stream S3Object records filled from list_objects_v2 pages, no HEAD request is sent"""
+        list_keys_args = {"Bucket": self.name, "Prefix": prefix, "MaxKeys": min(1000, page_size)}
+        if start_after:
+            list_keys_args["StartAfter"] = start_after
+        count = 0
+        for response in self._iter_pages(list_keys_args):
+            for content in response.get("Contents", []):
+                if max_keys and count >= max_keys:
+                    return
+                count += 1
+                yield S3Object.from_listing(self.name, content)
+
+    def download_many(
+        self,
+        keys_or_prefix: Union[str, Iterable[Union[str, "S3Object"]]],
+        dest_dir: str = None,
+        max_workers: int = 32,
+        chunk_size: int = 2**20,
+    ) -> Generator[S3DownloadEvent, None, None]:
+        """Download many objects concurrently, yields a S3DownloadEvent as each one completes
+
+        keys_or_prefix is a prefix to list or an iterable of keys or S3Object, consumed lazily.
+        Objects are written under dest_dir with their key layout (dest_dir/a/b.csv for a/b.csv),
+        or kept in memory in event.data when dest_dir is None. Each object costs a single GET,
+        max_workers requests run at once over one shared connection pool of the same size.
+        A failed download is reported in event.error and does not stop the others, keys resolving outside
+        of dest_dir (e.g. a/../../b) are not downloaded and reported with a ValueError.
+        """
+        if isinstance(keys_or_prefix, str):
+            keys = (o.key for o in self.iter_objects(keys_or_prefix) if not o.key.endswith("/"))
+        else:
+            keys = (k.key if isinstance(k, S3Object) else k for k in keys_or_prefix)
+        s3client = pooled_client(self.client, max_workers)
+
+        def download(key):
+            path = key_path(dest_dir, key) if dest_dir is not None else None
+            body = s3client.get_object(Bucket=self.name, Key=key)["Body"]
+            try:
+                if path is None:
+                    data = body.read()
+                    return S3DownloadEvent(key=key, data=data, bytes=len(data))
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as fh:
+                    copyfileobj(body, fh, chunk_size)
+                    return S3DownloadEvent(key=key, path=path, bytes=fh.tell())
+            finally:
+                body.close()
+
+        for key, future in bounded_imap(download, keys, max_workers=max_workers):
+            try:
+                yield future.result()
+            except Exception as e:
+                yield S3DownloadEvent(key=key, error=e)
+
+    def iter_objects_parallel(
+        self,
+        prefix="",
+        delimiter: str = "/",
+        max_workers: int = 8,
+        ordered: bool = True,
+        max_depth: int = 3,
+        min_shards: int = None,
+    ) -> Generator["S3Object", None, None]:
+        """Stream S3Object records, sub-prefixes found with delimiter are listed concurrently"""
+        from .listing import S3ParallelLister
+
+        return iter(
+            S3ParallelLister(
+                self,
+                prefix=prefix,
+                delimiter=delimiter,
+                max_workers=max_workers,
+                ordered=ordered,
+                max_depth=max_depth,
+                min_shards=min_shards,
+            )
+        )
+
+    def presign_many(self, keys: Iterable[str], method: str = "GET", expires: int = 3600) -> Dict[str, str]:
+        """Presigned URLs of keys, signed locally with a SigV4 signing key derived once (see oob.s3.presign)"""
+        from .presign import S3Presigner
+
+        return S3Presigner(self.client, self.name, method, expires).presign_many(keys)
+
+    def restore_objects(
+        self,
+        keys_or_prefix: Union[str, Iterable[Union[str, "S3Object"]]],
+        days: int = 1,
+        tier: str = "Standard",
+        max_workers: int = 16,
+        rate_limit: float = None,
+    ) -> "S3BatchRestore":
+        """Submit restore requests for archived objects, returns the S3BatchRestore following them"""
+        from .restore import S3BatchRestore
+
+        if isinstance(keys_or_prefix, str):
+            keys = (o.key for o in self.iter_objects(keys_or_prefix) if o.storage_class in ("GLACIER", "DEEP_ARCHIVE"))
+        else:
+            keys = keys_or_prefix
+        return S3BatchRestore(self, keys, days, tier, max_workers, rate_limit).submit()
 
-    def delete_objects(self, keys: List[str] = None, prefix: str = None) -> List[Dict]:
+    def key_index(self, path: str = None) -> "S3KeyIndex":
+        """Open the local SQLite key index of the bucket, see oob.s3.index.S3KeyIndex"""
+        from .index import S3KeyIndex
 
-        if prefix:
-            keys = self.list_keys(prefix)
+        return S3KeyIndex(self, path)
 
-        responses = []
-        for batch_no in range(0, len(keys), 1000):
-            responses.append(
-                self.client.delete_objects(
-                    Bucket=self.name, Delete={"Objects": [{"Key": k} for k in keys[batch_no : batch_no + 1000]]}
-                )
+    def delete_object(self, key):
+        return self.client.delete_object(Bucket=self.name, Key=key)
+
+    def delete_objects(
+        self,
+        keys: Iterable[str] = None,
+        prefix: str = None,
+        max_workers: int = None,
+        max_retries: int = 3,
+        retry_delay: float = 0.5,
+        whole_bucket: bool = False,
+    ) -> Union[List[Dict], S3DeleteSummary]:
+        """Delete keys, every key under prefix or, with whole_bucket=True, every key, by batches of 1000
+
+        keys are consumed lazily and objects under prefix are deleted while they are listed. With max_workers,
+        max_workers batches run concurrently, failed entries are retried max_retries times and a
+        S3DeleteSummary is returned, otherwise the delete_objects responses are.
+        """
+        if (keys is not None) + (prefix is not None) + whole_bucket != 1:
+            raise ValueError("delete_objects needs exactly one of keys, prefix or whole_bucket=True")
+        if prefix == "":
+            raise ValueError("delete_objects needs a non-empty prefix, use whole_bucket=True to empty the bucket")
+        if prefix or whole_bucket:
+            keys = (o.key for o in self.iter_objects(prefix or ""))
+        if max_workers:
+            return self._delete_objects_concurrently(keys, max_workers, max_retries, retry_delay)
+        return [
+            self.client.delete_objects(Bucket=self.name, Delete={"Objects": [{"Key": k} for k in batch]})
+            for batch in chunked(keys, 1000)
+        ]
+
+    def _delete_batch(self, keys: List[str], max_retries: int, retry_delay: float) -> Tuple[int, List[Dict]]:
+        retries = 0
+        while True:
+            response = self.client.delete_objects(
+                Bucket=self.name, Delete={"Objects": [{"Key": k} for k in keys], "Quiet": True}
             )
-        return responses
+            errors = response.get("Errors", [])
+            if not errors or retries >= max_retries:
+                return retries, errors
+            sleep(retry_delay * 2**retries)
+            retries += 1
+            keys = [e["Key"] for e in errors]
+
+    def _delete_objects_concurrently(
+        self, keys: Iterable[str], max_workers: int, max_retries: int, retry_delay: float
+    ) -> S3DeleteSummary:
+        summary = S3DeleteSummary()
+        batches = chunked(keys, 1000)
+        for batch, future in bounded_imap(
+            lambda b: self._delete_batch(b, max_retries, retry_delay), batches, max_workers=max_workers
+        ):
+            retries, errors = future.result()
+            summary.batches += 1
+            summary.retries += retries
+            summary.deleted += len(batch) - len(errors)
+            summary.errors.extend(errors)
+        return summary
+
+    def copy_prefix(
+        self,
+        prefix: str,
+        dest_prefix: str,
+        dest_bucket: str = None,
+        max_workers: int = 16,
+        part_size: int = 512 * 2**20,
+        callback: Callable[[S3CopySummary], None] = None,
+    ) -> S3CopySummary:
+        """Server-side copy of the objects under prefix to dest_prefix, callback receives the summary after each copy"""
+        return self._copy_prefix(prefix, dest_prefix, dest_bucket, max_workers, part_size, callback, move=False)
+
+    def move_prefix(
+        self,
+        prefix: str,
+        dest_prefix: str,
+        dest_bucket: str = None,
+        max_workers: int = 16,
+        part_size: int = 512 * 2**20,
+        callback: Callable[[S3CopySummary], None] = None,
+    ) -> S3CopySummary:
+        """Copy every object under prefix to dest_prefix, copied sources are deleted by batches of 1000"""
+        return self._copy_prefix(prefix, dest_prefix, dest_bucket, max_workers, part_size, callback, move=True)
+
+    def _copy_prefix(self, prefix, dest_prefix, dest_bucket, max_workers, part_size, callback, move) -> S3CopySummary:
+        dest_bucket = dest_bucket if dest_bucket else self.name
+        if dest_bucket == self.name and dest_prefix.startswith(prefix):
+            raise ValueError(f"dest_prefix {dest_prefix} must not be under prefix {prefix} in the same bucket")
+        summary = S3CopySummary()
+        to_delete = []
+
+        def copy(s3object):
+            source = {"Bucket": self.name, "Key": s3object.key}
+            dest_key = dest_prefix + s3object.key[len(prefix) :]
+            copy_object(self.client, source, dest_bucket, dest_key, s3object.size, part_size)
+
+        def delete(keys):
+            _, errors = self._delete_batch(keys, max_retries=3, retry_delay=0.5)
+            summary.deleted += len(keys) - len(errors)
+            summary.errors.extend((e["Key"], Exception(e.get("Message"))) for e in errors)
+
+        for s3object, future in bounded_imap(copy, self.iter_objects(prefix), max_workers=max_workers):
+            try:
+                future.result()
+            except Exception as e:
+                summary.errors.append((s3object.key, e))
+            else:
+                summary.copied += 1
+                summary.bytes += s3object.size
+                if move:
+                    to_delete.append(s3object.key)
+                    if len(to_delete) == 1000:
+                        delete(to_delete)
+                        to_delete = []
+            if callback:
+                callback(summary)
+        if to_delete:
+            delete(to_delete)
+        return summary
 
 
 class S3BucketPaginator:
@@ -121,47 +540,224 @@ class S3BucketPaginator:
 class S3Object(S3Base):
     bucket_name: str = None
     key: str = None
+    attributes_ttl: float = field(default=None, repr=False)
+    head: InitVar[Dict] = None
+    size: int = None
+    etag: str = None
+    last_modified: datetime = None
+    storage_class: str = None
+    transfer_profile: S3TransferProfile = field(default=None, repr=False)
     s3path: str = field(default=None, init=False)
     region: str = field(default=None, init=False)
     filename: str = field(default=None, init=False)
     prefix: str = field(default=None, init=False)
     suffix: str = field(default=None, init=False)
     is_folder: bool = field(default=None, init=False)
+    __attributes: Tuple = field(default=None, init=False, repr=False, compare=False)
+    __attributes_time: float = field(default=None, init=False, repr=False, compare=False)
 
-    def __post_init__(self):
+    def __post_init__(self, head):
         key_split = self.key.split("/")
         self.is_folder = self.key.endswith("/")
         self.filename = key_split[-1]
         self.prefix = "/".join(key_split[:-1])
         self.suffix = key_split[-1].split(".")[-1]
         self.s3path = f"s3://{self.bucket_name}/{self.key}"
-        self.attributes
+        self.region = _bucket_regions.get(self.bucket_name, (None,))[0]
+        self._use_region(self.region)
+        if head is not None:
+            self._set_attributes(head)
+
+    @staticmethod
+    def from_listing(bucket_name: str, content: Dict) -> "S3Object":
+        """Build an S3Object from a list_objects_v2 Contents entry"""
+        return S3Object(
+            bucket_name=bucket_name,
+            key=content["Key"],
+            size=content.get("Size"),
+            etag=content.get("ETag"),
+            last_modified=content.get("LastModified"),
+            storage_class=content.get("StorageClass"),
+        )
+
+    def _set_attributes(self, head: Dict):
+        self.__attributes = underscore_namedtuple("ObjectHead", head)
+        self.__attributes_time = monotonic()
+        self.size = head.get("ContentLength", self.size)
+        self.etag = head.get("ETag", self.etag)
+        self.last_modified = head.get("LastModified", self.last_modified)
+        self.storage_class = head.get("StorageClass", self.storage_class or "STANDARD")
 
     @property
-    def attributes(self) -> Tuple:
-        return underscore_namedtuple("ObjectHead", self.client.head_object(Bucket=self.bucket_name, Key=self.key))
+    def attributes_expired(self) -> bool:
+        if self.__attributes is None:
+            return True
+        if self.attributes_ttl is None:
+            return False
+        return monotonic() - self.__attributes_time >= self.attributes_ttl
 
-    def download_fileobj(self) -> BytesIO:
+    @property
+    def attributes(self) -> Tuple:
+        """Object metadata, fetched with a HEAD request on first access and cached for attributes_ttl seconds"""
+        if self.attributes_expired:
+            self.refresh()
+        return self.__attributes
+
+    def refresh(self) -> Tuple:
+        """Force a HEAD request and replace the cached metadata"""
+        self._set_attributes(self.client.head_object(Bucket=self.bucket_name, Key=self.key))
+        return self.__attributes
+
+    def download_fileobj(
+        self,
+        cache: "S3DiskCache" = None,
+        profile: S3TransferProfile = None,
+        callback: Callable[[S3TransferStats], None] = None,
+    ) -> BytesIO:
         fileobj = BytesIO()
-        self.client.download_fileobj(self.bucket_name, self.key, fileobj)
+        if cache:
+            with open(cache.get(self), "rb") as cached:
+                copyfileobj(cached, fileobj)
+        else:
+            with track_transfer(self.client, "download", self.bucket_name, self.key, self.size, callback) as stats:
+                self.client.download_fileobj(
+                    self.bucket_name, self.key, fileobj, Callback=stats, Config=self._transfer_config(profile)
+                )
         fileobj.seek(0)
         return fileobj
 
-    def copy_to(self, bucket, key) -> "S3Object":
-        self.client.copy(Bucket=bucket, Key=key, CopySource={"Bucket": self.bucket_name, "Key": self.key})
-        new = S3Object(bucket, key)
+    def open(
+        self,
+        mode: str = "rb",
+        block_size: int = 8 * 2**20,
+        cache_blocks: int = 8,
+        readahead: int = 2,
+        encoding: str = None,
+        newline: str = None,
+    ) -> Union[BufferedReader, TextIOWrapper]:
+        """Open the object as a seekable read-only file backed by Range GET requests, memory is bounded by the cache"""
+        from .reader import S3ObjectReader
+
+        if mode not in ("r", "rb"):
+            raise ValueError(f"invalid mode: '{mode}', S3Object can only be opened with 'r' or 'rb'")
+        fileobj = BufferedReader(S3ObjectReader(self, block_size, cache_blocks, readahead))
+        if mode == "r":
+            return TextIOWrapper(fileobj, encoding=encoding, newline=newline)
+        return fileobj
+
+    def iter_lines(
+        self, chunk_size: int = 2**20, compression: str = "auto", encoding: str = "utf-8", keepends: bool = False
+    ) -> Generator[str, None, None]:
+        """Stream the object line by line, .gz, .bz2 and .zst objects are decompressed on the fly"""
+        from .stream import iter_lines
+
+        return iter_lines(self, chunk_size, compression, encoding, keepends)
+
+    def iter_records(
+        self,
+        record_format: str = "auto",
+        chunk_size: int = 2**20,
+        compression: str = "auto",
+        encoding: str = "utf-8",
+        **csv_options,
+    ) -> Generator[Dict, None, None]:
+        """Stream JSON lines or CSV records as dicts, memory does not depend on the object size"""
+        from .stream import iter_records
+
+        return iter_records(self, record_format, chunk_size, compression, encoding, **csv_options)
+
+    def select(
+        self,
+        sql: str,
+        input_format: str = "csv",
+        output_format: str = "json",
+        compression: str = "NONE",
+        raw: bool = False,
+        scan_ranges: int = None,
+        max_workers: int = 4,
+        input_options: Dict = None,
+        output_options: Dict = None,
+    ) -> Generator[Union[bytes, Dict, List[str]], None, None]:
+        """Filter the object server side with S3 Select, yields rows or raw byte chunks when raw is True"""
+        from .select import S3Select
+
+        query = S3Select(
+            self,
+            sql,
+            input_format=input_format,
+            output_format=output_format,
+            compression=compression,
+            input_options=input_options,
+            output_options=output_options,
+            scan_ranges=scan_ranges,
+            max_workers=max_workers,
+        )
+        return query.iter_chunks() if raw else query.iter_rows()
+
+    def copy_to(
+        self, bucket, key, profile: S3TransferProfile = None, callback: Callable[[S3TransferStats], None] = None
+    ) -> "S3Object":
+        with track_transfer(self.client, "copy", bucket, key, self.size, callback) as stats:
+            self.client.copy(
+                Bucket=bucket,
+                Key=key,
+                CopySource={"Bucket": self.bucket_name, "Key": self.key},
+                Callback=stats,
+                Config=self._transfer_config(profile),
+            )
+        new = S3Object(bucket, key, size=self.size, transfer_profile=self.transfer_profile)
         return new
 
-    def move_to(self, bucket, key) -> "S3Object":
-        new = self.copy_to(bucket, key)
+    def move_to(
+        self, bucket, key, profile: S3TransferProfile = None, callback: Callable[[S3TransferStats], None] = None
+    ) -> "S3Object":
+        new = self.copy_to(bucket, key, profile, callback)
         self.delete()
         return new
 
     def delete(self):
+        self.__attributes = None
         return self.client.delete_object(Bucket=self.bucket_name, Key=self.key)
 
-    def download_to(self, dest):
-        return self.client.download_file(self.bucket_name, self.key, dest)
+    def download_to(
+        self,
+        dest,
+        cache: "S3DiskCache" = None,
+        profile: S3TransferProfile = None,
+        callback: Callable[[S3TransferStats], None] = None,
+        verify_checksum: bool = False,
+        max_workers: int = 8,
+    ):
+        """Download the object to dest
+
+        verify_checksum hashes the data while it is written and compares it to the checksum stored at upload
+        (see S3Bucket.upload_file checksum_algorithm), parts of multipart objects are fetched by max_workers
+        threads. oob.s3.checksum.S3ChecksumError is raised on mismatch.
+        """
+        if cache:
+            copyfile(cache.get(self), dest)
+            return
+        if verify_checksum:
+            from .checksum import download_verified
+
+            return download_verified(self, dest, max_workers)
+        with track_transfer(self.client, "download", self.bucket_name, self.key, self.size, callback) as stats:
+            return self.client.download_file(
+                self.bucket_name, self.key, dest, Callback=stats, Config=self._transfer_config(profile)
+            )
+
+    def restore_object(self, days: int = 1, tier: str = "Standard"):
+        return self.client.restore_object(
+            Bucket=self.bucket_name,
+            Key=self.key,
+            RestoreRequest={"Days": days, "GlacierJobParameters": {"Tier": tier}},
+        )
+
+    @property
+    def restore_status(self) -> str:
+        """pending, in_progress or available, read from the x-amz-restore header of a fresh HEAD"""
+        from .restore import restore_status
 
-    def restore_object(self):
-        return self.client.restore_object(self.bucket_name, self.key)
+        head = self.client.head_object(Bucket=self.bucket_name, Key=self.key)
+        self._set_attributes(head)
+        return restore_status(head)
@@ -0,0 +1,133 @@
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from dataclasses import dataclass
+from hashlib import sha256
+from threading import Lock
+from time import monotonic
+from botocore.exceptions import ClientError
+from . import S3Object
+
+
+@dataclass
+class S3CacheEntry:
+    etag: str
+    path: str
+    size: int
+    validated: float
+
+
+class S3DiskCache:
+    """Local disk cache of S3 objects keyed by bucket, key and ETag
+
+    Cached copies are revalidated with a conditional GET (IfNoneMatch) which costs a 304 when the
+    object did not change. Revalidation is skipped when the S3Object already carries the cached ETag
+    (e.g. built from a listing) or when the entry was validated less than validate_after seconds ago.
+    The least recently used entries are evicted once the cache holds more than max_size bytes.
+
+    >>> cache = S3DiskCache(max_size=2 * 2 ** 30)
+    >>> df = pd.read_csv(cache.get(s3object))
+    """
+
+    def __init__(self, root: str = None, max_size: int = 2**30, validate_after: float = None):
+        self.root = root if root else os.path.join(tempfile.gettempdir(), "oob-s3-cache")
+        self.max_size = max_size
+        self.validate_after = validate_after
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        os.makedirs(self.root, exist_ok=True)
+        self._load()
+
+    @staticmethod
+    def _digest(bucket_name: str, key: str) -> str:
+        return sha256(f"{bucket_name}/{key}".encode()).hexdigest()
+
+    def _load(self):
+        """Index the files left by a previous process, oldest access first"""
+        entries = []
+        for filename in os.listdir(self.root):
+            digest, _, etag = filename.partition(".")
+            if len(digest) != 64 or not etag or etag.endswith(".tmp"):
+                continue
+            path = os.path.join(self.root, filename)
+            stat = os.stat(path)
+            entry = S3CacheEntry(etag=f'"{etag}"', path=path, size=stat.st_size, validated=-float("inf"))
+            entries.append((stat.st_atime, digest, entry))
+        for _, digest, entry in sorted(entries, key=lambda e: e[0]):
+            self._entries[digest] = entry
+            self.size += entry.size
+        self._evict()
+
+    def get(self, s3object: S3Object) -> str:
+        """Return the path of an up to date local copy of s3object, downloading it if needed"""
+        digest = self._digest(s3object.bucket_name, s3object.key)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry:
+                self._entries.move_to_end(digest)
+        if entry and os.path.exists(entry.path):
+            fresh = self.validate_after is not None and monotonic() - entry.validated < self.validate_after
+            if s3object.etag == entry.etag or fresh:
+                self.hits += 1
+                return entry.path
+            try:
+                response = s3object.client.get_object(
+                    Bucket=s3object.bucket_name, Key=s3object.key, IfNoneMatch=entry.etag
+                )
+            except ClientError as e:
+                if e.response["Error"]["Code"] not in ("304", "NotModified"):
+                    raise
+                entry.validated = monotonic()
+                self.hits += 1
+                self.not_modified += 1
+                return entry.path
+        else:
+            response = s3object.client.get_object(Bucket=s3object.bucket_name, Key=s3object.key)
+        self.misses += 1
+        return self._store(digest, response)
+
+    def _store(self, digest: str, response) -> str:
+        etag = response["ETag"]
+        path = os.path.join(self.root, f"{digest}.{etag.strip(chr(34))}")
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=f"{digest}.", suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            shutil.copyfileobj(response["Body"], fh, 2**20)
+        os.replace(tmp_path, path)
+        entry = S3CacheEntry(etag=etag, path=path, size=os.path.getsize(path), validated=monotonic())
+        with self._lock:
+            previous = self._entries.pop(digest, None)
+            if previous:
+                self.size -= previous.size
+                if previous.path != path:
+                    self._remove(previous.path)
+            self._entries[digest] = entry
+            self.size += entry.size
+            self._evict()
+        return path
+
+    def _evict(self):
+        while self.size > self.max_size and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            self.size -= entry.size
+            self.evictions += 1
+            self._remove(entry.path)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        with self._lock:
+            for entry in self._entries.values():
+                self._remove(entry.path)
+            self._entries.clear()
+            self.size = 0
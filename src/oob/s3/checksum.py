@@ -0,0 +1,126 @@
+import os
+import zlib
+from base64 import b64encode
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import sha1, sha256
+from typing import Dict, List, Tuple
+from . import S3Object
+
+try:
+    from crc32c import crc32c as _crc32c
+except ImportError:
+    try:
+        from awscrt.checksums import crc32c as _crc32c
+    except ImportError:
+        _crc32c = None
+
+
+class Crc32:
+    """hashlib like CRC32 (zlib)"""
+
+    def __init__(self):
+        self.crc = 0
+
+    def update(self, data: bytes):
+        self.crc = zlib.crc32(data, self.crc)
+
+    def digest(self) -> bytes:
+        return self.crc.to_bytes(4, "big")
+
+
+class Crc32c(Crc32):
+    """hashlib like CRC32C, computed by the crc32c package or by awscrt (installed with boto3[crt])"""
+
+    def __init__(self):
+        if _crc32c is None:
+            raise ImportError("CRC32C checksums need the crc32c or awscrt package, pip install crc32c")
+        super().__init__()
+
+    def update(self, data: bytes):
+        self.crc = _crc32c(data, self.crc)
+
+
+ALGORITHMS = {"CRC32": Crc32, "CRC32C": Crc32c, "SHA1": sha1, "SHA256": sha256}
+
+
+class S3ChecksumError(ValueError):
+    pass
+
+
+def new_checksum(algorithm: str):
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"checksum algorithm must be one of {list(ALGORITHMS)}, not {algorithm}")
+    return ALGORITHMS[algorithm]()
+
+
+def encode(digest: bytes) -> str:
+    """Base64 representation used by the x-amz-checksum-* headers"""
+    return b64encode(digest).decode()
+
+
+def checksum(data: bytes, algorithm: str) -> str:
+    hasher = new_checksum(algorithm)
+    hasher.update(data)
+    return encode(hasher.digest())
+
+
+def composite_checksum(part_digests: List[bytes], algorithm: str) -> str:
+    """Checksum of a multipart object: checksum of the concatenated part digests followed by -<parts count>"""
+    return f"{checksum(b''.join(part_digests), algorithm)}-{len(part_digests)}"
+
+
+def stored_checksum(head: Dict) -> Tuple[str, str]:
+    """(algorithm, value) of the checksum returned by a HEAD sent with ChecksumMode=ENABLED, (None, None) if any"""
+    for algorithm in ALGORITHMS:
+        if head.get(f"Checksum{algorithm}"):
+            return algorithm, head[f"Checksum{algorithm}"]
+    return None, None
+
+
+def _download_range(s3object: S3Object, dest: str, algorithm: str, etag: str, part_number: int = None) -> bytes:
+    """Stream the object, or one of its parts, to its offset in dest while hashing it"""
+    request = dict(Bucket=s3object.bucket_name, Key=s3object.key, IfMatch=etag)
+    if part_number:
+        request["PartNumber"] = part_number
+    response = s3object.client.get_object(**request)
+    start = int(response["ContentRange"].split(" ")[1].split("-")[0]) if response.get("ContentRange") else 0
+    hasher = new_checksum(algorithm)
+    with open(dest, "r+b") as fh:
+        fh.seek(start)
+        for chunk in response["Body"].iter_chunks(2**20):
+            hasher.update(chunk)
+            fh.write(chunk)
+    return hasher.digest()
+
+
+def download_verified(s3object: S3Object, dest: str, max_workers: int = 8) -> str:
+    """Download s3object to dest and check it against the checksum S3 stored at upload, returns the checksum
+
+    The data is hashed while it is written, no second read of dest is needed. Multipart objects with a
+    composite checksum (value ending with -<parts count>) are downloaded part by part by max_workers threads,
+    each thread hashing its own part. Raises S3ChecksumError, and removes dest, when the checksums differ.
+    """
+    head = s3object.client.head_object(Bucket=s3object.bucket_name, Key=s3object.key, ChecksumMode="ENABLED")
+    algorithm, expected = stored_checksum(head)
+    if algorithm is None:
+        raise S3ChecksumError(f"{s3object.s3path} has no stored checksum, upload it with a checksum_algorithm")
+    with open(dest, "wb"):
+        pass
+    try:
+        value, _, parts = expected.partition("-")
+        if parts:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                digests = list(
+                    executor.map(
+                        lambda n: _download_range(s3object, dest, algorithm, head["ETag"], n), range(1, int(parts) + 1)
+                    )
+                )
+            actual = composite_checksum(digests, algorithm)
+        else:
+            actual = encode(_download_range(s3object, dest, algorithm, head["ETag"]))
+        if actual != expected:
+            raise S3ChecksumError(f"{algorithm} checksum of {s3object.s3path} is {actual}, expected {expected}")
+    except Exception:
+        os.remove(dest)
+        raise
+    return actual
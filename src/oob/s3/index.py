@@ -0,0 +1,253 @@
+import csv
+import json
+import os
+import sqlite3
+import tempfile
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Generator, Iterable, List, Union
+from urllib.parse import unquote_plus
+from oob.utils import chunked
+from . import S3Bucket, S3Object
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    key TEXT PRIMARY KEY,
+    size INTEGER,
+    etag TEXT,
+    last_modified REAL,
+    storage_class TEXT,
+    generation INTEGER
+);
+CREATE INDEX IF NOT EXISTS objects_last_modified ON objects (last_modified);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+def _prefix_end(prefix: str) -> str:
+    """Smallest string greater than every string starting with prefix"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+PARQUET_COLUMNS = {
+    "key": "Key",
+    "size": "Size",
+    "last_modified_date": "LastModifiedDate",
+    "e_tag": "ETag",
+    "storage_class": "StorageClass",
+    "is_latest": "IsLatest",
+    "is_delete_marker": "IsDeleteMarker",
+}
+
+
+def _timestamp(value: Union[datetime, str]) -> float:
+    """POSIX timestamp of a datetime or of an inventory date (2021-01-20T10:00:00.000Z)"""
+    if isinstance(value, str):
+        value = datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%fZ").replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class S3KeyIndex:
+    """Local SQLite index of the keys of a bucket
+
+    The index is filled from a listing (refresh) or from an S3 Inventory report (load_inventory)
+    and queried locally by prefix, suffix, size and modification date. Prefix lookups are range
+    scans on the primary key, a query over millions of keys takes milliseconds.
+    refresh(prefix, append_only=True) only lists the keys after the last indexed one, which
+    is enough for prefixes where keys are only added in order (e.g. dates, sequence numbers).
+
+    >>> index = S3KeyIndex(bucket)
+    >>> index.refresh("logs/")
+    >>> index.keys("logs/2021-01-", suffix=".gz", min_size=1)
+    """
+
+    def __init__(self, bucket: S3Bucket, path: str = None):
+        self.bucket = bucket
+        self.path = path if path else os.path.join(tempfile.gettempdir(), f"oob-s3-index-{bucket.name}.sqlite")
+        self._lock = Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.executescript(SCHEMA)
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._connection.execute("SELECT COUNT(*) FROM objects").fetchone()[0]
+
+    def _generation(self) -> int:
+        row = self._connection.execute("SELECT value FROM meta WHERE name = 'generation'").fetchone()
+        generation = int(row[0]) + 1 if row else 1
+        self._connection.execute("INSERT OR REPLACE INTO meta VALUES ('generation', ?)", (str(generation),))
+        return generation
+
+    def _upsert(self, rows: Iterable[tuple], generation: int) -> int:
+        count = 0
+        for batch in chunked(rows, 1000):
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?, ?)", [row + (generation,) for row in batch]
+            )
+            count += len(batch)
+        return count
+
+    @staticmethod
+    def _range(prefix: str) -> tuple:
+        if not prefix:
+            return "1 = 1", ()
+        return "key >= ? AND key < ?", (prefix, _prefix_end(prefix))
+
+    def refresh(self, prefix: str = "", append_only: bool = False, max_workers: int = None) -> int:
+        """Index the keys under prefix and drop the indexed keys that were deleted, returns the number listed
+
+        append_only lists only the keys after the last indexed key under prefix and keeps the others,
+        max_workers lists sub-prefixes concurrently with iter_objects_parallel.
+        """
+        where, params = self._range(prefix)
+        start_after = None
+        if append_only:
+            start_after = self._connection.execute(f"SELECT MAX(key) FROM objects WHERE {where}", params).fetchone()[0]
+        if start_after:
+            objects = self.bucket.iter_objects(prefix, start_after=start_after)
+        elif max_workers:
+            objects = self.bucket.iter_objects_parallel(prefix, max_workers=max_workers, ordered=False)
+        else:
+            objects = self.bucket.iter_objects(prefix)
+        rows = (
+            (o.key, o.size, o.etag, _timestamp(o.last_modified) if o.last_modified else None, o.storage_class)
+            for o in objects
+        )
+        with self._lock, self._connection:
+            generation = self._generation()
+            count = self._upsert(rows, generation)
+            if not start_after:
+                self._connection.execute(
+                    f"DELETE FROM objects WHERE {where} AND generation < ?", params + (generation,)
+                )
+        return count
+
+    def load_inventory(self, manifest: Union[S3Object, str]) -> int:
+        """Replace the index content with an S3 Inventory report, manifest is the manifest.json object or its s3 path
+
+        CSV reports are streamed, Parquet reports need pandas and pyarrow. Returns the number of keys loaded.
+        """
+        if isinstance(manifest, str):
+            bucket_name, _, key = manifest.replace("s3://", "", 1).partition("/")
+            manifest = S3Object(bucket_name, key)
+        description = json.loads(manifest.download_fileobj().read())
+        if description.get("sourceBucket", self.bucket.name) != self.bucket.name:
+            raise ValueError(f"inventory of bucket {description['sourceBucket']}, not {self.bucket.name}")
+        file_format = description["fileFormat"].lower()
+        if file_format not in ("csv", "parquet"):
+            raise ValueError(f"inventory format must be CSV or Parquet, not {description['fileFormat']}")
+        fields = [f.strip() for f in description["fileSchema"].split(",")] if file_format == "csv" else None
+        destination = description["destinationBucket"].split(":")[-1]
+        files = [S3Object(destination, f["key"]) for f in description["files"]]
+        reader = self._iter_inventory_csv if file_format == "csv" else self._iter_inventory_parquet
+        with self._lock, self._connection:
+            generation = self._generation()
+            count = sum(self._upsert(reader(f, fields), generation) for f in files)
+            self._connection.execute("DELETE FROM objects WHERE generation < ?", (generation,))
+        return count
+
+    @staticmethod
+    def _inventory_row(record: dict) -> tuple:
+        etag = record.get("ETag")
+        last_modified = record.get("LastModifiedDate")
+        return (
+            record["Key"],
+            int(record["Size"]) if record.get("Size") not in (None, "") else None,
+            f'"{etag}"' if etag else None,
+            _timestamp(last_modified) if last_modified else None,
+            record.get("StorageClass") or None,
+        )
+
+    def _iter_inventory_csv(self, s3object: S3Object, fields: List[str]) -> Generator[tuple, None, None]:
+        for row in csv.reader(s3object.iter_lines(compression="gzip", keepends=True)):
+            record = dict(zip(fields, row))
+            if record.get("IsLatest", "true") != "true" or record.get("IsDeleteMarker", "false") == "true":
+                continue
+            record["Key"] = unquote_plus(record["Key"])
+            yield self._inventory_row(record)
+
+    def _iter_inventory_parquet(self, s3object: S3Object, fields: List[str] = None) -> Generator[tuple, None, None]:
+        import pandas as pd
+
+        frame = pd.read_parquet(s3object.download_fileobj())
+        columns = [PARQUET_COLUMNS.get(c, c) for c in frame.columns]
+        for values in frame.itertuples(index=False):
+            record = dict(zip(columns, values))
+            if record.get("IsLatest") is False or record.get("IsDeleteMarker") is True:
+                continue
+            yield self._inventory_row(record)
+
+    def _select(
+        self,
+        columns: str,
+        prefix: str,
+        suffix: str,
+        min_size: int,
+        max_size: int,
+        modified_after: datetime,
+        modified_before: datetime,
+        limit: int,
+    ) -> sqlite3.Cursor:
+        where, params = self._range(prefix)
+        clauses, params = [where], list(params)
+        if suffix:
+            clauses.append("substr(key, -?) = ?")
+            params += [len(suffix), suffix]
+        for clause, value in (
+            ("size >= ?", min_size),
+            ("size <= ?", max_size),
+            ("last_modified >= ?", _timestamp(modified_after) if modified_after else None),
+            ("last_modified < ?", _timestamp(modified_before) if modified_before else None),
+        ):
+            if value is not None:
+                clauses.append(clause)
+                params.append(value)
+        sql = f"SELECT {columns} FROM objects WHERE {' AND '.join(clauses)} ORDER BY key"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self._connection.execute(sql, params)
+
+    def keys(
+        self,
+        prefix: str = "",
+        suffix: str = None,
+        min_size: int = None,
+        max_size: int = None,
+        modified_after: datetime = None,
+        modified_before: datetime = None,
+        limit: int = None,
+    ) -> List[str]:
+        """Indexed keys matching every given filter, in key order"""
+        cursor = self._select("key", prefix, suffix, min_size, max_size, modified_after, modified_before, limit)
+        return [row[0] for row in cursor]
+
+    def objects(
+        self,
+        prefix: str = "",
+        suffix: str = None,
+        min_size: int = None,
+        max_size: int = None,
+        modified_after: datetime = None,
+        modified_before: datetime = None,
+        limit: int = None,
+    ) -> Generator[S3Object, None, None]:
+        """Same as keys, as S3Object records filled from the index, no request is sent"""
+        columns = "key, size, etag, last_modified, storage_class"
+        cursor = self._select(columns, prefix, suffix, min_size, max_size, modified_after, modified_before, limit)
+        for key, size, etag, last_modified, storage_class in cursor:
+            yield S3Object(
+                self.bucket.name,
+                key,
+                size=size,
+                etag=etag,
+                last_modified=datetime.fromtimestamp(last_modified, tz=timezone.utc) if last_modified else None,
+                storage_class=storage_class,
+            )
@@ -0,0 +1,97 @@
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import chain
+from typing import List, Tuple, Generator
+from oob.utils import iter_parallel
+from . import S3Bucket, S3Object
+
+
+class S3ParallelLister:
+    """List a large prefix by splitting it into sub-prefixes listed concurrently
+
+    Sub-prefixes are discovered level by level with Delimiter/CommonPrefixes until at least
+    min_shards are found, max_depth levels were walked or a level has no CommonPrefixes. Each shard
+    is then listed in a bounded thread pool and results are streamed either in key order (ordered=True)
+    or in arrival order. At most queue_size pages per shard are buffered, so memory stays bounded while
+    listing.
+
+    A level is paged through only while its pages hold CommonPrefixes: from its first page without any,
+    the rest of the level is a single shard listed from StartAfter that page's last key. A flat prefix
+    (e.g. one partition holding millions of files) is thus streamed right away, but sequentially: keys
+    alone give no split points, so it is not sharded.
+
+    >>> for obj in S3ParallelLister(bucket, prefix="events/", max_workers=16):
+    ...     print(obj.key, obj.size)
+    """
+
+    def __init__(
+        self,
+        bucket: S3Bucket,
+        prefix: str = "",
+        delimiter: str = "/",
+        max_workers: int = 8,
+        ordered: bool = True,
+        max_depth: int = 3,
+        min_shards: int = None,
+        page_size: int = 1000,
+        queue_size: int = 4,
+    ):
+        self.bucket = bucket
+        self.prefix = prefix
+        self.delimiter = delimiter
+        self.max_workers = max_workers
+        self.ordered = ordered
+        self.max_depth = max_depth
+        self.min_shards = min_shards if min_shards else max_workers * 4
+        self.page_size = min(1000, page_size)
+        self.queue_size = queue_size
+
+    def __iter__(self) -> Generator[S3Object, None, None]:
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            loose, shards = self._discover(executor)
+        factories = [partial(self._iter_shard, prefix, start_after) for prefix, start_after in shards]
+        pages = iter_parallel(factories, self.max_workers, self.ordered, self.queue_size)
+        objects = chain.from_iterable(pages)
+        if self.ordered:
+            yield from heapq.merge(loose, objects, key=lambda o: o.key)
+        else:
+            yield from loose
+            yield from objects
+
+    def _list_level(self, prefix: str) -> Tuple[List[S3Object], List[str], List[Tuple[str, str]]]:
+        """Objects and sub-prefixes of the pages holding CommonPrefixes, and the shard of the rest of the level"""
+        list_keys_args = {
+            "Bucket": self.bucket.name,
+            "Prefix": prefix,
+            "Delimiter": self.delimiter,
+            "MaxKeys": self.page_size,
+        }
+        objects, prefixes = [], []
+        for response in self.bucket._iter_pages(list_keys_args):
+            objects.extend(S3Object.from_listing(self.bucket.name, c) for c in response.get("Contents", []))
+            prefixes.extend(p["Prefix"] for p in response.get("CommonPrefixes", []))
+            if "NextContinuationToken" in response and not response.get("CommonPrefixes"):
+                return objects, prefixes, [(prefix, objects[-1].key)]
+        return objects, prefixes, []
+
+    def _discover(self, executor: ThreadPoolExecutor) -> Tuple[List[S3Object], List[Tuple[str, str]]]:
+        """Walk the delimiter tree, objects found on the way are returned apart from the (prefix, start_after) shards"""
+        loose, shards, prefixes, depth = [], [], [self.prefix], 0
+        while prefixes and depth < self.max_depth and len(prefixes) + len(shards) < self.min_shards:
+            next_prefixes = []
+            for objects, sub_prefixes, rest in executor.map(self._list_level, prefixes):
+                loose.extend(objects)
+                next_prefixes.extend(sub_prefixes)
+                shards.extend(rest)
+            prefixes = next_prefixes
+            depth += 1
+        shards.extend((prefix, None) for prefix in prefixes)
+        return sorted(loose, key=lambda o: o.key), sorted(shards, key=lambda s: s[1] or s[0])
+
+    def _iter_shard(self, prefix: str, start_after: str = None) -> Generator[List[S3Object], None, None]:
+        list_keys_args = {"Bucket": self.bucket.name, "Prefix": prefix, "MaxKeys": self.page_size}
+        if start_after:
+            list_keys_args["StartAfter"] = start_after
+        for response in self.bucket._iter_pages(list_keys_args):
+            yield [S3Object.from_listing(self.bucket.name, c) for c in response.get("Contents", [])]
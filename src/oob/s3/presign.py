@@ -0,0 +1,94 @@
+import hmac
+from base64 import b64encode
+from hashlib import sha1, sha256
+from typing import Dict, Iterable
+from urllib.parse import quote, urlsplit
+
+CLIENT_METHODS = {"GET": "get_object", "PUT": "put_object", "HEAD": "head_object", "DELETE": "delete_object"}
+TEMPLATE_KEY = "oob-presign-template"
+
+
+def _hmac(key: bytes, message: str) -> bytes:
+    return hmac.new(key, message.encode(), sha256).digest()
+
+
+class S3Presigner:
+    """Presigned URLs for many keys of one bucket
+
+    botocore signs one template URL, its endpoint, path layout, expiry, credential scope and timestamp
+    are reused for every key. With SigV4 the signing key is derived once, signing a key then costs one
+    SHA-256 of the canonical request and one HMAC. The URLs are the ones generate_presigned_url would
+    build at the same instant, SigV2 (s3) URLs are built the same way and any other signer falls back
+    to generate_presigned_url.
+
+    The secret key comes from credentials (e.g. session.get_credentials()), by default from the client.
+
+    >>> urls = S3Presigner(s3client, "my-bucket", "GET", 900).presign_many(keys)
+    """
+
+    def __init__(self, client, bucket: str, method: str = "GET", expires: int = 3600, credentials=None):
+        if method not in CLIENT_METHODS:
+            raise ValueError(f"method must be one of {list(CLIENT_METHODS)}, not {method}")
+        self.client = client
+        self.bucket = bucket
+        self.method = method
+        self.expires = expires
+        self.credentials = credentials
+        template = client.generate_presigned_url(
+            CLIENT_METHODS[method], Params={"Bucket": bucket, "Key": TEMPLATE_KEY}, ExpiresIn=expires
+        )
+        url = urlsplit(template)
+        self.base_url = f"{url.scheme}://{url.netloc}"
+        self.path_prefix, _, self.path_suffix = url.path.partition(TEMPLATE_KEY)
+        params = dict(p.split("=", 1) for p in url.query.split("&"))
+        if url.path.count(TEMPLATE_KEY) != 1:
+            self.signature_version = None
+        elif params.get("X-Amz-Algorithm") == "AWS4-HMAC-SHA256" and params.get("X-Amz-SignedHeaders") == "host":
+            self.signature_version = "s3v4"
+            self._init_v4(url.netloc, params)
+        elif "Signature" in params and "AWSAccessKeyId" in params:
+            self.signature_version = "s3"
+            self._init_v2(params)
+        else:
+            self.signature_version = None
+
+    def _credentials(self):
+        credentials = self.credentials if self.credentials else self.client._get_credentials()
+        return credentials.get_frozen_credentials()
+
+    def _init_v4(self, host: str, params: Dict[str, str]):
+        params.pop("X-Amz-Signature")
+        self.query = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+        self.headers = f"host:{host}\n\nhost\nUNSIGNED-PAYLOAD"
+        scope = params["X-Amz-Credential"].replace("%2F", "/").split("/", 1)[1]
+        self.string_to_sign_prefix = f"AWS4-HMAC-SHA256\n{params['X-Amz-Date']}\n{scope}\n"
+        signing_key = f"AWS4{self._credentials().secret_key}".encode()
+        for part in scope.split("/"):
+            signing_key = _hmac(signing_key, part)
+        self.signing_key = signing_key
+
+    def _init_v2(self, params: Dict[str, str]):
+        credentials = self._credentials()
+        token = f"x-amz-security-token:{credentials.token}\n" if credentials.token else ""
+        self.string_to_sign_prefix = f"{self.method}\n\n\n{params['Expires']}\n{token}/{self.bucket}/"
+        self.query_prefix = f"AWSAccessKeyId={params['AWSAccessKeyId']}&Signature="
+        self.query_suffix = "".join(f"&{k}={v}" for k, v in params.items() if k not in ("AWSAccessKeyId", "Signature"))
+        self.signing_key = credentials.secret_key.encode()
+
+    def presign(self, key: str) -> str:
+        if self.signature_version is None:
+            return self.client.generate_presigned_url(
+                CLIENT_METHODS[self.method], Params={"Bucket": self.bucket, "Key": key}, ExpiresIn=self.expires
+            )
+        quoted_key = quote(key, safe="/~")
+        path = f"{self.path_prefix}{quoted_key}{self.path_suffix}"
+        if self.signature_version == "s3":
+            digest = hmac.new(self.signing_key, (self.string_to_sign_prefix + quoted_key).encode(), sha1).digest()
+            return f"{self.base_url}{path}?{self.query_prefix}{quote(b64encode(digest), safe='')}{self.query_suffix}"
+        canonical_request = f"{self.method}\n{path}\n{self.query}\n{self.headers}"
+        string_to_sign = self.string_to_sign_prefix + sha256(canonical_request.encode()).hexdigest()
+        signature = hmac.new(self.signing_key, string_to_sign.encode(), sha256).hexdigest()
+        return f"{self.base_url}{path}?{self.query}&X-Amz-Signature={signature}"
+
+    def presign_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        return {key: self.presign(key) for key in keys}
@@ -0,0 +1,124 @@
+import io
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+from threading import Lock
+from typing import Dict
+from . import S3Object
+
+
+class S3ObjectReader(io.RawIOBase):
+    """Seekable, read-only raw file object backed by HTTP Range GET requests
+
+    The object is read by blocks of block_size bytes, at most cache_blocks blocks are kept in a
+    LRU cache and, on sequential access, the next readahead blocks are fetched by background threads.
+    Range requests carry the ETag known at open time (IfMatch), so a concurrent overwrite raises
+    a PreconditionFailed error instead of returning mixed content.
+
+    >>> with io.BufferedReader(S3ObjectReader(s3object, block_size=16 * 2 ** 20)) as f:
+    ...     zipfile.ZipFile(f).namelist()
+    """
+
+    def __init__(self, s3object: S3Object, block_size: int = 8 * 2**20, cache_blocks: int = 8, readahead: int = 2):
+        super().__init__()
+        if s3object.size is None or s3object.etag is None:
+            s3object.refresh()
+        self.s3object = s3object
+        self.size = s3object.size
+        self.etag = s3object.etag
+        self.block_size = block_size
+        self.cache_blocks = max(cache_blocks, readahead + 1)
+        self.readahead = readahead
+        self.requests = 0
+        self._position = 0
+        self._last_block = None
+        self._cache = OrderedDict()
+        self._inflight: Dict[int, Future] = {}
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(max_workers=readahead) if readahead else None
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = self.size + offset
+        else:
+            raise ValueError(f"invalid whence ({whence}, should be 0, 1 or 2)")
+        if position < 0:
+            raise ValueError(f"negative seek position {position}")
+        self._position = position
+        return position
+
+    def readinto(self, buffer) -> int:
+        if self.closed:
+            raise ValueError("I/O operation on closed file.")
+        view = memoryview(buffer).cast("B")
+        written = 0
+        while written < len(view) and self._position < self.size:
+            block_no, offset = divmod(self._position, self.block_size)
+            data = self._get_block(block_no)
+            count = min(len(view) - written, len(data) - offset)
+            view[written : written + count] = data[offset : offset + count]
+            written += count
+            self._position += count
+        return written
+
+    def close(self):
+        if not self.closed:
+            with self._lock:
+                for future in self._inflight.values():
+                    future.cancel()
+                self._inflight.clear()
+                self._cache.clear()
+            if self._executor:
+                self._executor.shutdown(wait=False)
+        super().close()
+
+    def _fetch(self, block_no: int) -> bytes:
+        start = block_no * self.block_size
+        end = min(start + self.block_size, self.size) - 1
+        self.requests += 1
+        response = self.s3object.client.get_object(
+            Bucket=self.s3object.bucket_name, Key=self.s3object.key, Range=f"bytes={start}-{end}", IfMatch=self.etag
+        )
+        return response["Body"].read()
+
+    def _get_block(self, block_no: int) -> bytes:
+        with self._lock:
+            data = self._cache.get(block_no)
+            if data is not None:
+                self._cache.move_to_end(block_no)
+            future = self._inflight.pop(block_no, None)
+        if data is None:
+            data = future.result() if future else self._fetch(block_no)
+            self._store(block_no, data)
+        if self._executor and block_no != self._last_block and block_no in (0, (self._last_block or 0) + 1):
+            self._schedule_readahead(block_no)
+        self._last_block = block_no
+        return data
+
+    def _store(self, block_no: int, data: bytes):
+        with self._lock:
+            self._cache[block_no] = data
+            self._cache.move_to_end(block_no)
+            while len(self._cache) > self.cache_blocks:
+                self._cache.popitem(last=False)
+
+    def _schedule_readahead(self, block_no: int):
+        last_block = (self.size - 1) // self.block_size
+        with self._lock:
+            for stale in [b for b in self._inflight if not block_no < b <= block_no + self.readahead]:
+                self._inflight.pop(stale).cancel()
+            for next_block in range(block_no + 1, min(block_no + self.readahead, last_block) + 1):
+                if next_block not in self._cache and next_block not in self._inflight:
+                    self._inflight[next_block] = self._executor.submit(self._fetch, next_block)
@@ -0,0 +1,166 @@
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic, sleep
+from typing import Dict, Generator, Iterable, List, Union
+from botocore.exceptions import ClientError
+from oob.utils import bounded_imap
+from . import S3Bucket, S3Object, S3DownloadEvent
+
+PENDING = "pending"
+IN_PROGRESS = "in_progress"
+AVAILABLE = "available"
+FAILED = "failed"
+
+
+def restore_status(head: Dict) -> str:
+    """Restore state of an object from its HEAD response (x-amz-restore header)"""
+    restore = head.get("Restore")
+    if restore is None:
+        archived = head.get("StorageClass") in ("GLACIER", "DEEP_ARCHIVE")
+        return PENDING if archived else AVAILABLE
+    return IN_PROGRESS if 'ongoing-request="true"' in restore else AVAILABLE
+
+
+@dataclass
+class S3RestoreEvent:
+    key: str
+    status: str
+    error: Exception = None
+    download: S3DownloadEvent = None
+
+
+class S3BatchRestore:
+    """Restore many archived (GLACIER, DEEP_ARCHIVE) objects and follow them until they are readable
+
+    submit() sends the RestoreObject requests with max_workers threads, at most rate_limit requests per second.
+    iter_available() then HEADs the objects still in progress concurrently, with an exponential delay
+    between rounds (poll_interval doubled up to max_interval), and yields the keys as they are restored.
+
+    >>> restore = bucket.restore_objects("archive/2019/", days=3, tier="Bulk")
+    >>> for event in restore.download_available("/data/2019"):
+    ...     print(event.key, event.status)
+    """
+
+    def __init__(
+        self,
+        bucket: S3Bucket,
+        keys: Iterable[Union[str, S3Object]],
+        days: int = 1,
+        tier: str = "Standard",
+        max_workers: int = 16,
+        rate_limit: float = None,
+    ):
+        self.bucket = bucket
+        self.keys = keys
+        self.days = days
+        self.tier = tier
+        self.max_workers = max_workers
+        self.rate_limit = rate_limit
+        self.states: Dict[str, str] = {}
+        self.errors: Dict[str, Exception] = {}
+        self._next_request = 0.0
+        self._lock = Lock()
+
+    def _throttle(self):
+        if not self.rate_limit:
+            return
+        with self._lock:
+            now = monotonic()
+            wait = self._next_request - now
+            self._next_request = max(now, self._next_request) + 1 / self.rate_limit
+        if wait > 0:
+            sleep(wait)
+
+    def _restore(self, key: str) -> str:
+        self._throttle()
+        try:
+            self.bucket.client.restore_object(
+                Bucket=self.bucket.name,
+                Key=key,
+                RestoreRequest={"Days": self.days, "GlacierJobParameters": {"Tier": self.tier}},
+            )
+        except ClientError as e:
+            code = e.response["Error"]["Code"]
+            if code == "RestoreAlreadyInProgress":
+                return IN_PROGRESS
+            if code == "InvalidObjectState":
+                return AVAILABLE
+            raise
+        return IN_PROGRESS
+
+    def _head(self, key: str) -> str:
+        self._throttle()
+        return restore_status(self.bucket.client.head_object(Bucket=self.bucket.name, Key=key))
+
+    def _run(self, func, keys: Iterable[str]) -> Generator[str, None, None]:
+        """Apply func to keys concurrently, record the new states and yield the keys that became available"""
+        for key, future in bounded_imap(func, keys, max_workers=self.max_workers):
+            try:
+                status = future.result()
+            except Exception as e:
+                status = FAILED
+                self.errors[key] = e
+            self.states[key] = status
+            if status == AVAILABLE:
+                yield key
+
+    def submit(self) -> "S3BatchRestore":
+        """Send a RestoreObject request for every key, objects that are not archived are marked available"""
+        keys = (k.key if isinstance(k, S3Object) else k for k in self.keys)
+        for _ in self._run(self._restore, keys):
+            pass
+        return self
+
+    def keys_with_status(self, status: str) -> List[str]:
+        return [k for k, s in self.states.items() if s == status]
+
+    def poll(self) -> List[str]:
+        """HEAD the objects in progress once, returns the keys restored since the last poll"""
+        return list(self._run(self._head, self.keys_with_status(IN_PROGRESS)))
+
+    def iter_available(
+        self, poll_interval: float = 60, max_interval: float = 900, timeout: float = None
+    ) -> Generator[List[str], None, None]:
+        """Yield the lists of keys available after submit() then after each poll round, until none is in progress
+
+        Raises TimeoutError when objects are still being restored after timeout seconds.
+        """
+        deadline = monotonic() + timeout if timeout is not None else None
+        available = self.keys_with_status(AVAILABLE)
+        if available:
+            yield available
+        delay = poll_interval
+        while self.keys_with_status(IN_PROGRESS):
+            if deadline is not None and monotonic() + delay > deadline:
+                raise TimeoutError(f"{len(self.keys_with_status(IN_PROGRESS))} objects are still being restored")
+            sleep(delay)
+            delay = min(delay * 2, max_interval)
+            available = self.poll()
+            if available:
+                yield available
+
+    def download_available(
+        self,
+        dest_dir: str = None,
+        poll_interval: float = 60,
+        max_interval: float = 900,
+        timeout: float = None,
+    ) -> Generator[S3RestoreEvent, None, None]:
+        """Download the objects as they are restored (see S3Bucket.download_many)
+
+        Keys whose restore request or HEAD failed are reported once, with a FAILED event, before the
+        next downloads and when no object is in progress anymore.
+        """
+        reported = set()
+
+        def failures():
+            for key in list(self.errors):
+                if key not in reported:
+                    reported.add(key)
+                    yield S3RestoreEvent(key=key, status=FAILED, error=self.errors[key])
+
+        for keys in self.iter_available(poll_interval, max_interval, timeout):
+            yield from failures()
+            for event in self.bucket.download_many(keys, dest_dir, max_workers=self.max_workers):
+                yield S3RestoreEvent(key=event.key, status=AVAILABLE, error=event.error, download=event)
+        yield from failures()
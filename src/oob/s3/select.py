@@ -0,0 +1,116 @@
+import csv
+import json
+from functools import partial
+from threading import Lock
+from typing import Dict, Generator, Iterable, List, Union
+from oob.utils import iter_parallel
+from . import S3Object
+
+FORMATS = {"csv": ("CSV", {"FileHeaderInfo": "USE"}), "json": ("JSON", {"Type": "LINES"}), "parquet": ("Parquet", {})}
+
+
+def input_serialization(input_format: str, compression: str = "NONE", options: Dict = None) -> Dict:
+    if input_format not in FORMATS:
+        raise ValueError(f"input_format must be one of {list(FORMATS)}, not {input_format}")
+    name, defaults = FORMATS[input_format]
+    return {name: dict(defaults, **(options if options else {})), "CompressionType": compression}
+
+
+def output_serialization(output_format: str, options: Dict = None) -> Dict:
+    if output_format not in ("csv", "json"):
+        raise ValueError(f"output_format must be csv or json, not {output_format}")
+    return {output_format.upper(): dict({"RecordDelimiter": "\n"}, **(options if options else {}))}
+
+
+class S3Select:
+    """Run a S3 Select SQL expression and stream its results
+
+    Filtering and projection happen server side, only matching records are transferred.
+    With scan_ranges, an uncompressed CSV or JSON lines object is split in as many byte ranges,
+    scanned concurrently by max_workers threads, results keep the object order.
+
+    >>> query = S3Select(s3object, "SELECT s.id, s.amount FROM S3Object s WHERE s.country = 'FR'")
+    >>> for row in query.iter_rows():
+    ...     print(row["id"])
+    """
+
+    def __init__(
+        self,
+        s3object: S3Object,
+        sql: str,
+        input_format: str = "csv",
+        output_format: str = "json",
+        compression: str = "NONE",
+        input_options: Dict = None,
+        output_options: Dict = None,
+        scan_ranges: int = None,
+        max_workers: int = 4,
+    ):
+        self.s3object = s3object
+        self.sql = sql
+        self.output_format = output_format
+        self.input_serialization = input_serialization(input_format, compression, input_options)
+        self.output_serialization = output_serialization(output_format, output_options)
+        self.record_delimiter = self.output_serialization[output_format.upper()]["RecordDelimiter"].encode()
+        if scan_ranges and (input_format == "parquet" or compression != "NONE"):
+            raise ValueError("scan_ranges is only supported for uncompressed csv and json objects")
+        self.scan_ranges = scan_ranges
+        self.max_workers = max_workers
+        self.bytes_scanned = 0
+        self.bytes_returned = 0
+        self._lock = Lock()
+
+    def _ranges(self) -> List[Dict]:
+        size = self.s3object.size if self.s3object.size is not None else self.s3object.refresh().content_length
+        step = max(1, -(-size // self.scan_ranges))
+        return [{"Start": start, "End": min(start + step, size) - 1} for start in range(0, size, step)]
+
+    def _iter_range(self, scan_range: Dict = None) -> Generator[bytes, None, None]:
+        request = dict(
+            Bucket=self.s3object.bucket_name,
+            Key=self.s3object.key,
+            Expression=self.sql,
+            ExpressionType="SQL",
+            InputSerialization=self.input_serialization,
+            OutputSerialization=self.output_serialization,
+        )
+        if scan_range:
+            request["ScanRange"] = scan_range
+        response = self.s3object.client.select_object_content(**request)
+        for event in response["Payload"]:
+            if "Records" in event:
+                yield event["Records"]["Payload"]
+            elif "Stats" in event:
+                with self._lock:
+                    self.bytes_scanned += event["Stats"]["Details"].get("BytesScanned", 0)
+                    self.bytes_returned += event["Stats"]["Details"].get("BytesReturned", 0)
+
+    def iter_chunks(self) -> Generator[bytes, None, None]:
+        """Raw record payloads as sent by S3, a record can be split across two chunks"""
+        if not self.scan_ranges:
+            yield from self._iter_range()
+            return
+        factories = [partial(self._iter_range, scan_range) for scan_range in self._ranges()]
+        yield from iter_parallel(factories, max_workers=self.max_workers, ordered=True)
+
+    def iter_records(self) -> Generator[bytes, None, None]:
+        """Complete records without their delimiter"""
+        remainder = b""
+        for chunk in self.iter_chunks():
+            records = (remainder + chunk).split(self.record_delimiter)
+            remainder = records.pop()
+            yield from records
+        if remainder:
+            yield remainder
+
+    def iter_rows(self) -> Generator[Union[Dict, List[str]], None, None]:
+        """Decoded rows, dicts for json output and lists of strings for csv output"""
+        if self.output_format == "json":
+            for record in self.iter_records():
+                yield json.loads(record)
+        else:
+            yield from csv.reader(self._iter_lines())
+
+    def _iter_lines(self) -> Iterable[str]:
+        for record in self.iter_records():
+            yield record.decode() + "\n"
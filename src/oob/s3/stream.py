@@ -0,0 +1,110 @@
+import bz2
+import codecs
+import csv
+import json
+import zlib
+from typing import Callable, Dict, Generator, Iterable, Union
+from . import S3Object
+
+SUFFIXES = {"gz": "gzip", "gzip": "gzip", "bz2": "bz2", "zst": "zstd", "zstd": "zstd"}
+
+
+def _zstd_decompressobj():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstandard package is required to read zstd compressed objects: pip install zstandard")
+    return zstandard.ZstdDecompressor().decompressobj()
+
+
+DECOMPRESSORS = {
+    "gzip": lambda: zlib.decompressobj(zlib.MAX_WBITS | 16),
+    "bz2": bz2.BZ2Decompressor,
+    "zstd": _zstd_decompressobj,
+}
+
+
+class Decompressor:
+    """Incremental decompression of concatenated gzip, bz2 or zstd streams"""
+
+    def __init__(self, compression: str):
+        if compression not in DECOMPRESSORS:
+            raise ValueError(f"compression must be one of {list(DECOMPRESSORS)}, not {compression}")
+        self.factory: Callable = DECOMPRESSORS[compression]
+        self.decompressobj = self.factory()
+
+    def decompress(self, data: bytes) -> bytes:
+        output = []
+        while data:
+            output.append(self.decompressobj.decompress(data))
+            if getattr(self.decompressobj, "eof", False):
+                data = self.decompressobj.unused_data
+                self.decompressobj = self.factory()
+            else:
+                data = b""
+        return b"".join(output)
+
+
+def detect_compression(s3object: S3Object) -> str:
+    return SUFFIXES.get(s3object.suffix.lower()) if "." in s3object.filename else None
+
+
+def iter_chunks(s3object: S3Object, chunk_size: int = 2**20, compression: str = "auto") -> Generator[bytes, None, None]:
+    """Stream the object body by chunks of about chunk_size bytes, decompressed on the fly"""
+    if compression == "auto":
+        compression = detect_compression(s3object)
+    decompressor = Decompressor(compression) if compression else None
+    body = s3object.client.get_object(Bucket=s3object.bucket_name, Key=s3object.key)["Body"]
+    try:
+        for chunk in body.iter_chunks(chunk_size):
+            data = decompressor.decompress(chunk) if decompressor else chunk
+            if data:
+                yield data
+    finally:
+        body.close()
+
+
+def iter_lines(
+    s3object: S3Object,
+    chunk_size: int = 2**20,
+    compression: str = "auto",
+    encoding: str = "utf-8",
+    keepends: bool = False,
+) -> Generator[str, None, None]:
+    """Stream decoded lines split on '\\n', a trailing '\\r' is removed unless keepends is True"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    remainder = ""
+    for data in iter_chunks(s3object, chunk_size, compression):
+        lines = (remainder + decoder.decode(data)).split("\n")
+        remainder = lines.pop()
+        for line in lines:
+            yield line + "\n" if keepends else line.rstrip("\r")
+    remainder += decoder.decode(b"", final=True)
+    if remainder:
+        yield remainder if keepends else remainder.rstrip("\r")
+
+
+def iter_records(
+    s3object: S3Object,
+    record_format: str = "auto",
+    chunk_size: int = 2**20,
+    compression: str = "auto",
+    encoding: str = "utf-8",
+    **csv_options,
+) -> Generator[Union[Dict, Iterable], None, None]:
+    """Stream JSON lines records as dicts or CSV rows as dicts keyed by the header
+
+    record_format is "jsonl" or "csv", "auto" picks it from the key suffix (e.g. data.jsonl.gz),
+    csv_options are passed to csv.DictReader (delimiter, fieldnames...).
+    """
+    if record_format == "auto":
+        suffixes = s3object.filename.lower().split(".")[1:]
+        record_format = "csv" if "csv" in suffixes else "jsonl"
+    if record_format == "jsonl":
+        for line in iter_lines(s3object, chunk_size, compression, encoding):
+            if line.strip():
+                yield json.loads(line)
+    elif record_format == "csv":
+        yield from csv.DictReader(iter_lines(s3object, chunk_size, compression, encoding, keepends=True), **csv_options)
+    else:
+        raise ValueError(f"record_format must be jsonl, csv or auto, not {record_format}")
@@ -0,0 +1,127 @@
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from hashlib import md5
+from typing import Dict, List, Tuple
+from oob.utils import bounded_imap
+from . import S3Bucket, S3Object, key_path
+
+
+@dataclass
+class S3SyncSummary:
+    transferred: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    skipped: int = 0
+    errors: List[Tuple[str, Exception]] = field(default_factory=list)
+
+
+@dataclass
+class S3Sync:
+    """Incremental synchronisation between a local directory and a bucket prefix
+
+    Files are compared by size and modification time against one streamed listing of the prefix,
+    with checksum=True the MD5 of local files is also compared to single part ETags. Only changed
+    files are transferred, by a pool of max_workers threads, and with delete=True the files missing
+    on the source side are deleted from the destination.
+    """
+
+    bucket: S3Bucket
+    local_dir: str
+    prefix: str = ""
+    delete: bool = False
+    max_workers: int = 8
+    checksum: bool = False
+
+    def __post_init__(self):
+        self.local_dir = os.path.abspath(self.local_dir)
+        if self.prefix and not self.prefix.endswith("/"):
+            self.prefix += "/"
+
+    def _local_files(self) -> Dict[str, os.stat_result]:
+        files = {}
+        for root, _, filenames in os.walk(self.local_dir):
+            for filename in filenames:
+                path = os.path.join(root, filename)
+                files[os.path.relpath(path, self.local_dir).replace(os.sep, "/")] = os.stat(path)
+        return files
+
+    def _remote_objects(self) -> Dict[str, S3Object]:
+        return {o.key[len(self.prefix) :]: o for o in self.bucket.iter_objects(self.prefix) if not o.key.endswith("/")}
+
+    def _changed(self, relpath: str, stat: os.stat_result, remote: S3Object, newer: str) -> bool:
+        if stat.st_size != remote.size:
+            return True
+        local_mtime = datetime.fromtimestamp(int(stat.st_mtime), tz=timezone.utc)
+        if newer == "local" and local_mtime > remote.last_modified:
+            return True
+        if newer == "remote" and remote.last_modified > local_mtime:
+            return True
+        if self.checksum and remote.etag and "-" not in remote.etag:
+            with open(os.path.join(self.local_dir, *relpath.split("/")), "rb") as fh:
+                digest = md5()
+                for chunk in iter(lambda: fh.read(2**20), b""):
+                    digest.update(chunk)
+            return f'"{digest.hexdigest()}"' != remote.etag
+        return False
+
+    def _transfer(self, transfer, relpaths: List[str], summary: S3SyncSummary):
+        for relpath, future in bounded_imap(transfer, relpaths, max_workers=self.max_workers):
+            try:
+                future.result()
+                summary.transferred.append(relpath)
+            except Exception as e:
+                summary.errors.append((relpath, e))
+
+    def upload(self) -> S3SyncSummary:
+        summary = S3SyncSummary()
+        local, remote = self._local_files(), self._remote_objects()
+        changed = []
+        for relpath, stat in local.items():
+            if relpath in remote and not self._changed(relpath, stat, remote[relpath], newer="local"):
+                summary.skipped += 1
+            else:
+                changed.append(relpath)
+
+        def upload(relpath):
+            self.bucket.client.upload_file(
+                os.path.join(self.local_dir, *relpath.split("/")),
+                self.bucket.name,
+                self.prefix + relpath,
+                Config=self.bucket._transfer_config(),
+            )
+
+        self._transfer(upload, changed, summary)
+        if self.delete:
+            extras = [self.prefix + relpath for relpath in remote if relpath not in local]
+            result = self.bucket.delete_objects(extras, max_workers=self.max_workers)
+            failed = {e["Key"]: e for e in result.errors}
+            summary.deleted.extend(k[len(self.prefix) :] for k in extras if k not in failed)
+            summary.errors.extend((k[len(self.prefix) :], Exception(e.get("Message"))) for k, e in failed.items())
+        return summary
+
+    def download(self) -> S3SyncSummary:
+        summary = S3SyncSummary()
+        local, remote = self._local_files(), self._remote_objects()
+        changed = []
+        for relpath, s3object in remote.items():
+            if relpath in local and not self._changed(relpath, local[relpath], s3object, newer="remote"):
+                summary.skipped += 1
+            else:
+                changed.append(relpath)
+
+        def download(relpath):
+            path = key_path(self.local_dir, relpath)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.bucket.client.download_file(
+                self.bucket.name, self.prefix + relpath, path, Config=self.bucket._transfer_config()
+            )
+            mtime = remote[relpath].last_modified.timestamp()
+            os.utime(path, (mtime, mtime))
+
+        self._transfer(download, changed, summary)
+        if self.delete:
+            for relpath in local:
+                if relpath not in remote:
+                    os.remove(os.path.join(self.local_dir, *relpath.split("/")))
+                    summary.deleted.append(relpath)
+        return summary
@@ -0,0 +1,322 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from threading import Lock
+from time import monotonic
+from typing import Callable, Dict, Tuple
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from oob.utils import copy_client
+
+MB = 2**20
+
+PART_OPERATIONS = {"PutObject", "UploadPart", "GetObject", "CopyObject", "UploadPartCopy"}
+
+
+@dataclass
+class S3TransferProfile:
+    """Tuning of managed transfers (upload_file, download_file, copy)
+
+    threshold: size from which multipart transfers are used
+    part_size: size of each part
+    max_concurrency: number of threads transferring parts of one object
+    max_bandwidth: bytes per second limit, None for unlimited
+    """
+
+    part_size: int = 8 * MB
+    threshold: int = 8 * MB
+    max_concurrency: int = 10
+    max_bandwidth: int = None
+    use_threads: bool = True
+
+    @property
+    def config(self) -> TransferConfig:
+        return TransferConfig(
+            multipart_threshold=self.threshold,
+            multipart_chunksize=self.part_size,
+            max_concurrency=self.max_concurrency,
+            max_bandwidth=self.max_bandwidth,
+            use_threads=self.use_threads,
+        )
+
+
+@dataclass
+class S3TransferStats:
+    """Progress of one transfer, the instance is used as the s3transfer progress Callback"""
+
+    operation: str
+    bucket: str
+    key: str
+    size: int = None
+    bytes: int = 0
+    parts: int = 0
+    retries: int = 0
+    elapsed: float = 0.0
+    finished: bool = False
+    started: float = field(default_factory=monotonic, repr=False)
+    callback: Callable[["S3TransferStats"], None] = field(default=None, repr=False, compare=False)
+    _lock: Lock = field(default_factory=Lock, init=False, repr=False, compare=False)
+
+    @property
+    def throughput(self) -> float:
+        """Bytes per second"""
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+
+    def __call__(self, bytes_amount: int):
+        with self._lock:
+            self.bytes += bytes_amount
+            self.elapsed = monotonic() - self.started
+        if self.callback:
+            self.callback(self)
+
+
+_active: Dict[Tuple[str, str], S3TransferStats] = {}
+_active_lock = Lock()
+_clients = set()
+
+
+def _on_client_params(params, context, **kwargs):
+    stats = _active.get((params.get("Bucket"), params.get("Key")))
+    if stats:
+        context["oob_transfer_stats"] = stats
+
+
+def _on_after_call(parsed, model, context, **kwargs):
+    stats = context.get("oob_transfer_stats")
+    if stats:
+        with stats._lock:
+            stats.retries += parsed.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+            if model.name in PART_OPERATIONS:
+                stats.parts += 1
+
+
+def _register(client):
+    with _active_lock:
+        if id(client) in _clients:
+            return
+        client.meta.events.register("provide-client-params.s3", _on_client_params)
+        client.meta.events.register("after-call.s3", _on_after_call)
+        _clients.add(id(client))
+
+
+@contextmanager
+def track_transfer(client, operation: str, bucket: str, key: str, size: int = None, callback: Callable = None):
+    """Yield a S3TransferStats counting parts and retries of the requests sent for bucket/key
+
+    callback receives the stats on every progress update and once more when the transfer is finished.
+    """
+    _register(client)
+    stats = S3TransferStats(operation=operation, bucket=bucket, key=key, size=size, callback=callback)
+    with _active_lock:
+        _active[(bucket, key)] = stats
+    try:
+        yield stats
+    finally:
+        with _active_lock:
+            _active.pop((bucket, key), None)
+        stats.elapsed = monotonic() - stats.started
+        stats.finished = True
+        if callback:
+            callback(stats)
+
+
+_pooled_clients = {}
+
+
+def pooled_client(client, max_pool_connections: int):
+    """Return client, or a shared copy of it whose connection pool holds max_pool_connections connections"""
+    if max_pool_connections <= client.meta.config.max_pool_connections:
+        return client
+    cache_key = (id(client), max_pool_connections)
+    with _active_lock:
+        if cache_key not in _pooled_clients:
+            _pooled_clients[cache_key] = copy_client(
+                client, config=client.meta.config.merge(Config(max_pool_connections=max_pool_connections))
+            )
+        return _pooled_clients[cache_key]
+
+
+class S3ResumableUpload:
+    """Multipart upload of a local file that can be resumed after a failure
+
+    The upload id and the ETag of every completed part are written to a JSON checkpoint file.
+    When upload() is called again for the same file (same size and modification time) the parts
+    already uploaded are skipped and only the remaining ones are sent, by max_workers threads.
+    The checkpoint is deleted once the upload is completed.
+    With checksum_algorithm, each worker computes the checksum of its part from the bytes it already holds
+    and S3 verifies it, the object then carries a composite checksum (see oob.s3.checksum).
+
+    >>> S3ResumableUpload(client, "/data/dump.bin", "my-bucket", "dumps/dump.bin").upload()
+    """
+
+    MIN_PART_SIZE = 5 * MB
+    MAX_PARTS = 10000
+
+    def __init__(
+        self,
+        client,
+        filename: str,
+        bucket: str,
+        key: str,
+        part_size: int = 16 * MB,
+        max_workers: int = 8,
+        checkpoint: str = None,
+        extra_args: Dict = None,
+        checksum_algorithm: str = None,
+    ):
+        self.client = client
+        self.filename = filename
+        self.bucket = bucket
+        self.key = key
+        self.max_workers = max_workers
+        self.extra_args = dict(extra_args) if extra_args else {}
+        self.checksum_algorithm = checksum_algorithm
+        if checksum_algorithm:
+            self.extra_args["ChecksumAlgorithm"] = checksum_algorithm
+        stat = os.stat(filename)
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime
+        self.part_size = max(part_size, self.MIN_PART_SIZE, -(-self.size // self.MAX_PARTS))
+        self.checkpoint = checkpoint if checkpoint else f"{filename}.s3upload.json"
+        self.upload_id = None
+        self.parts: Dict[int, str] = {}
+        self.checksums: Dict[int, str] = {}
+        self._lock = Lock()
+
+    @property
+    def part_count(self) -> int:
+        return max(1, -(-self.size // self.part_size))
+
+    def _load_checkpoint(self) -> bool:
+        try:
+            with open(self.checkpoint) as fh:
+                state = json.load(fh)
+        except (FileNotFoundError, ValueError):
+            return False
+        if (state.get("bucket"), state.get("key")) != (self.bucket, self.key):
+            return False
+        if (state.get("size"), state.get("mtime")) != (self.size, self.mtime):
+            self._abort(state["upload_id"])
+            return False
+        self.part_size = state["part_size"]
+        self.upload_id = state["upload_id"]
+        try:
+            paginator = self.client.get_paginator("list_parts")
+            pages = paginator.paginate(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+            for part in (p for page in pages for p in page.get("Parts", [])):
+                self.parts[part["PartNumber"]] = part["ETag"]
+                if self.checksum_algorithm and part.get(f"Checksum{self.checksum_algorithm}"):
+                    self.checksums[part["PartNumber"]] = part[f"Checksum{self.checksum_algorithm}"]
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "NoSuchUpload":
+                raise
+            self.upload_id, self.parts, self.checksums = None, {}, {}
+            return False
+        return True
+
+    def _abort(self, upload_id: str):
+        try:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=upload_id)
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "NoSuchUpload":
+                raise
+
+    def _save_checkpoint(self):
+        state = dict(
+            bucket=self.bucket,
+            key=self.key,
+            size=self.size,
+            mtime=self.mtime,
+            part_size=self.part_size,
+            upload_id=self.upload_id,
+            parts={str(n): etag for n, etag in self.parts.items()},
+            checksums={str(n): value for n, value in self.checksums.items()},
+        )
+        tmp_path = f"{self.checkpoint}.tmp"
+        with open(tmp_path, "w") as fh:
+            json.dump(state, fh)
+        os.replace(tmp_path, self.checkpoint)
+
+    def _upload_part(self, part_number: int):
+        with open(self.filename, "rb") as fh:
+            fh.seek((part_number - 1) * self.part_size)
+            body = fh.read(self.part_size)
+        part_args = {}
+        if self.checksum_algorithm:
+            from .checksum import checksum
+
+            part_args[f"Checksum{self.checksum_algorithm}"] = checksum(body, self.checksum_algorithm)
+        response = self.client.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id, PartNumber=part_number, Body=body, **part_args
+        )
+        with self._lock:
+            self.parts[part_number] = response["ETag"]
+            if part_args:
+                self.checksums[part_number] = part_args[f"Checksum{self.checksum_algorithm}"]
+            self._save_checkpoint()
+
+    def _completed_part(self, part_number: int) -> Dict:
+        part = {"PartNumber": part_number, "ETag": self.parts[part_number]}
+        if part_number in self.checksums:
+            part[f"Checksum{self.checksum_algorithm}"] = self.checksums[part_number]
+        return part
+
+    def upload(self) -> Dict:
+        """Upload the missing parts and complete the upload, returns the complete_multipart_upload response"""
+        if not self._load_checkpoint():
+            response = self.client.create_multipart_upload(Bucket=self.bucket, Key=self.key, **self.extra_args)
+            self.upload_id = response["UploadId"]
+            self._save_checkpoint()
+        missing = [n for n in range(1, self.part_count + 1) if n not in self.parts]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for future in [executor.submit(self._upload_part, n) for n in missing]:
+                future.result()
+        response = self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            MultipartUpload={"Parts": [self._completed_part(n) for n in sorted(self.parts)]},
+        )
+        os.remove(self.checkpoint)
+        return response
+
+
+MAX_COPY_SIZE = 5 * 2**30
+
+
+def copy_object(
+    client, source: Dict, bucket: str, key: str, size: int = None, part_size: int = 512 * MB, max_workers: int = 4
+) -> Dict:
+    """Server-side copy, objects larger than MAX_COPY_SIZE are copied by parallel UploadPartCopy requests"""
+    if size is None or size <= MAX_COPY_SIZE:
+        return client.copy_object(Bucket=bucket, Key=key, CopySource=source)
+
+    head = client.head_object(**source)
+    extra_args = {k: head[k] for k in ("ContentType", "ContentEncoding", "Metadata", "StorageClass") if k in head}
+    upload_id = client.create_multipart_upload(Bucket=bucket, Key=key, **extra_args)["UploadId"]
+    part_size = max(part_size, -(-size // S3ResumableUpload.MAX_PARTS))
+
+    def copy_part(part_number):
+        start = (part_number - 1) * part_size
+        response = client.upload_part_copy(
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            CopySource=source,
+            CopySourceRange=f"bytes={start}-{min(start + part_size, size) - 1}",
+        )
+        return {"PartNumber": part_number, "ETag": response["CopyPartResult"]["ETag"]}
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            parts = list(executor.map(copy_part, range(1, -(-size // part_size) + 1)))
+        return client.complete_multipart_upload(
+            Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+        )
+    except Exception:
+        client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
@@ -3,6 +3,10 @@ import os
 import re
 from dataclasses import dataclass, field
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+from queue import Queue, Full
+from threading import Event
 import time
 import zipfile
 from datetime import datetime
@@ -17,6 +21,133 @@ def underscore_namedtuple(name, d):
     return the_tuple
 
 
+def chunked(iterable, size):
+    """Yield lists of at most size items, consuming iterable lazily."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def bounded_imap(func, iterable, max_workers=8, max_pending=None):
+    """
+    Apply func to each item in a thread pool, yielding (item, future) as they complete.
+
+    Items are pulled lazily from iterable and at most max_pending calls are queued or running,
+    so memory stays flat whatever the size of iterable.
+    """
+    max_pending = max_pending if max_pending else max_workers * 2
+    iterator = iter(iterable)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        try:
+            for item in islice(iterator, max_pending):
+                pending[executor.submit(func, item)] = item
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future
+                for item in islice(iterator, len(done)):
+                    pending[executor.submit(func, item)] = item
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+_DONE = object()
+
+
+def _put(queue, item, stop):
+    while not stop.is_set():
+        try:
+            queue.put(item, timeout=0.1)
+            return True
+        except Full:
+            continue
+    return False
+
+
+def _produce(factory, queue, stop):
+    if stop.is_set():
+        return
+    try:
+        for item in factory():
+            if not _put(queue, item, stop):
+                return
+    except Exception as e:
+        _put(queue, e, stop)
+    _put(queue, _DONE, stop)
+
+
+def _drain(queue, producers=1):
+    while producers:
+        item = queue.get()
+        if item is _DONE:
+            producers -= 1
+        elif isinstance(item, Exception):
+            raise item
+        else:
+            yield item
+
+
+def iter_parallel(factories, max_workers=8, ordered=True, queue_size=4):
+    """
+    Run the generators returned by factories in a thread pool and yield their items.
+
+    With ordered=True the items of each generator are yielded in factories order, otherwise as they arrive.
+    A generator runs at most queue_size items ahead of the consumer and exceptions are raised to the consumer.
+    """
+    stop = Event()
+    futures = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            if ordered:
+                queues = [Queue(queue_size) for _ in factories]
+                for factory, queue in zip(factories, queues):
+                    futures.append(executor.submit(_produce, factory, queue, stop))
+                for queue in queues:
+                    yield from _drain(queue)
+            else:
+                queue = Queue(queue_size * max_workers)
+                for factory in factories:
+                    futures.append(executor.submit(_produce, factory, queue, stop))
+                yield from _drain(queue, len(factories))
+        finally:
+            stop.set()
+            for future in futures:
+                future.cancel()
+
+
+def client_credentials(client):
+    """Keyword arguments creating a boto3 client signing with the current credentials of client."""
+    credentials = client._get_credentials()
+    if credentials is None:
+        return {}
+    frozen = credentials.get_frozen_credentials()
+    return dict(
+        aws_access_key_id=frozen.access_key, aws_secret_access_key=frozen.secret_key, aws_session_token=frozen.token
+    )
+
+
+def copy_client(client, **options):
+    """
+    Return a new client of the service, region, endpoint and config of client, overridden by options.
+
+    The copy shares the credentials of client, whatever session they come from (explicit keys, assumed role),
+    and temporary credentials keep being refreshed by their provider.
+    """
+    from boto3 import client as boto3_client
+
+    kwargs = dict(region_name=client.meta.region_name, endpoint_url=client.meta.endpoint_url, config=client.meta.config)
+    kwargs.update(options, **client_credentials(client))
+    copy = boto3_client(client.meta.service_model.service_name, **kwargs)
+    if client._get_credentials() is not None:
+        copy._request_signer._credentials = client._get_credentials()
+    return copy
+
+
 def mkdir(path):
     if not os.path.exists(path):
         os.makedirs(path)
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=unused-argument
 """Test base objects."""
+
 from oob.awslambda.event import *
 from boto3 import client
 from moto import mock_sqs, mock_sns
@@ -82,6 +83,27 @@ def test_sns_event():
     assert event.notification.message_id == "95df01b4-ee98-5cb9-9903-4c221d41eb5e"
 
 
+def test_s3_event(mocker):
+    get_bucket_location = mocker.spy(S3Bucket.client, "get_bucket_location")
+    payload = {
+        "Records": [
+            {
+                "eventSource": "aws:s3",
+                "awsRegion": "eu-west-3",
+                "eventName": "ObjectCreated:Put",
+                "s3": {
+                    "bucket": {"name": "event-bucket", "arn": "arn:aws:s3:::event-bucket"},
+                    "object": {"key": "data/file+name.csv", "size": 1024},
+                },
+            }
+        ]
+    }
+    event = S3Event()(payload, {})
+    assert (event.bucket.name, event.bucket.region) == ("event-bucket", "eu-west-3")
+    assert event.s3object.key == "data/file name.csv"
+    assert get_bucket_location.call_count == 0
+
+
 def test_sfn_event():
     """Test SFN Event."""
     payload = {"georefOf": "Home", "coords": {"carts": {"x-datum": 0.381018, "y-datum": 622.2269926397355}}}
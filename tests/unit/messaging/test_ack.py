@@ -0,0 +1,60 @@
+import os
+import pytest
+from oob.messaging.ack import SQSAckBuffer
+from oob.messaging.sqs import SQSBatchEntryError, SQSQueue
+from boto3 import client
+from moto import mock_sqs
+
+
+@mock_sqs
+def test_sqs_ack_buffer(mocker):
+    sqs = client("sqs", region_name="eu-west-1")
+    sqs.create_queue(QueueName="my-queue")
+    queue = SQSQueue(name="my-queue", account=os.getenv("AWS_ACCOUNT_ID"), region=os.getenv("AWS_DEFAULT_REGION"))
+    for i in range(25):
+        queue.send_message(f"message{i}")
+    delete_message_batch = mocker.spy(SQSQueue.client, "delete_message_batch")
+
+    messages = queue.receive_message_batch(25)
+    with SQSAckBuffer(queue, flush_interval=60) as acks:
+        futures = [acks.ack(message) for message in messages[:20]]
+        futures += [acks.ack(message.receipt_handle) for message in messages[20:]]
+    assert [len(c.kwargs["Entries"]) for c in delete_message_batch.call_args_list] == [10, 10, 5]
+    assert all(f.result() is None for f in futures)
+    assert acks.deleted == 25 and acks.failures == []
+    assert queue.number_of_messages == 0
+    with pytest.raises(RuntimeError):
+        acks.ack(messages[0])
+
+    queue.send_message("lingering")
+    delete_message_batch.reset_mock()
+    acks = SQSAckBuffer(queue, flush_interval=0.01)
+    acks.ack(queue.receive_message_batch(1)[0]).result(timeout=5)
+    assert delete_message_batch.call_count == 1
+    acks.close()
+
+
+def test_sqs_ack_buffer_retries(mocker):
+    queue = mocker.Mock()
+    responses = iter(
+        [
+            {
+                "Successful": [{"Id": "0"}],
+                "Failed": [
+                    {"Id": "1", "Code": "InternalError", "SenderFault": False, "Message": "retry me"},
+                    {"Id": "2", "Code": "ReceiptHandleIsInvalid", "SenderFault": True, "Message": "expired"},
+                ],
+            },
+            {"Successful": [{"Id": "0"}], "Failed": []},
+        ]
+    )
+    queue.delete_message_batch.side_effect = lambda receipt_handles: next(responses)
+
+    with SQSAckBuffer(queue, flush_interval=60, retry_delay=0) as acks:
+        a, b, c = acks.ack("a"), acks.ack("b"), acks.ack("c")
+    assert (a.result(), b.result()) == (None, None)
+    with pytest.raises(SQSBatchEntryError) as error:
+        c.result()
+    assert (error.value.code, error.value.sender_fault) == ("ReceiptHandleIsInvalid", True)
+    assert queue.delete_message_batch.call_args_list[1].args == (["b"],)
+    assert acks.deleted == 2 and [h for h, _ in acks.failures] == ["c"]
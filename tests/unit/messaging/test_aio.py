@@ -0,0 +1,134 @@
+import asyncio
+import os
+import socket
+import pytest
+from oob.messaging import aio
+from oob.messaging.aio import AsyncClient, AsyncSNSTopic, AsyncSNSTopicNotification, AsyncSQSQueue, close_clients
+from oob.messaging.sqs import SQSBase, SQSQueue
+from boto3 import Session, client
+from botocore.credentials import RefreshableCredentials
+from moto import mock_sns, mock_sqs
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.run_until_complete(close_clients())
+        loop.close()
+
+
+@mock_sqs
+def test_async_sqs_queue(mocker):
+    mocker.patch.object(aio, "get_session", None)
+    sqs = client("sqs", region_name="eu-west-1")
+    sqs.create_queue(QueueName="my-queue")
+    get_queue_url = mocker.spy(SQSBase.client, "get_queue_url")
+
+    async def scenario():
+        queue = await AsyncSQSQueue.create(
+            name="my-queue", account=os.getenv("AWS_ACCOUNT_ID"), region=os.getenv("AWS_DEFAULT_REGION")
+        )
+        with pytest.raises(TypeError):
+            queue.number_of_messages
+        sent = await asyncio.gather(*(queue.send_message(f"message{i}", {"index": i}) for i in range(25)))
+        assert len({m.id for m in sent}) == 25 and all(m.body_md5 for m in sent)
+        assert await queue.get_number_of_messages() == 25
+        assert aio.async_client(SQSBase.client)._pooled_client._get_credentials() is SQSBase.client._get_credentials()
+        received = await queue.receive_message_batch(30)
+        assert sorted(m.body for m in received) == sorted(f"message{i}" for i in range(25))
+        assert received[0].message_attributes["index"] == received[0].body[7:]
+        response = await queue.change_message_visibility_batch([m.receipt_handle for m in received[:12]], 0)
+        assert len(response["Successful"]) == 12
+        await received[12].delete()
+        response = await queue.delete_message_batch([m.receipt_handle for m in received[13:]])
+        assert len(response["Successful"]) == 12 and response["Failed"] == []
+        message = await queue.receive_message(wait_time=1)
+        await message.delete()
+        return queue, await queue.get_number_of_messages()
+
+    queue, number_of_messages = run(scenario())
+    assert number_of_messages == 11 and queue.url.endswith("/my-queue")
+    assert get_queue_url.call_count == 0
+    assert SQSQueue(arn=queue.arn).number_of_messages == 11
+
+
+@mock_sns
+def test_async_sns(mocker):
+    mocker.patch.object(aio, "get_session", None)
+    sns = client("sns")
+    topic_arn = sns.create_topic(Name="sns-lambda")["TopicArn"]
+
+    async def scenario():
+        topic = await AsyncSNSTopic.create(arn=topic_arn)
+        assert topic.attributes.topic_arn == topic_arn
+        ids = await asyncio.gather(*(topic.publish(f"Hello {i}", subject="test") for i in range(20)))
+        notification = AsyncSNSTopicNotification(topic_arn=topic_arn, subject="test", message="Hello")
+        return ids + [await notification.publish()]
+
+    assert len(set(run(scenario()))) == 21
+
+
+def test_async_clients_per_event_loop():
+    async def shared_client():
+        aclient = aio.async_client(SQSBase.client)
+        assert aclient is aio.async_client(SQSBase.client)
+        return aclient
+
+    loop = asyncio.new_event_loop()
+    first = loop.run_until_complete(shared_client())
+    assert run(shared_client()) is not first
+    assert loop.run_until_complete(shared_client()) is first
+    loop.run_until_complete(close_clients())
+    loop.close()
+    assert len(aio._clients) == 0
+
+
+def test_aiobotocore_client(mocker):
+    pytest.importorskip("aiobotocore")
+    server = pytest.importorskip("moto.server")
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    moto_server = server.ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+    moto_server.start()
+    try:
+        session = Session(aws_access_key_id="role-key", aws_secret_access_key="role-secret")
+        sqs = session.client("sqs", region_name="eu-west-1", endpoint_url=f"http://127.0.0.1:{port}")
+        url = sqs.create_queue(QueueName="my-queue")["QueueUrl"]
+        metadata = dict(
+            access_key="refreshed-key", secret_key="secret", token="token", expiry_time="2100-01-01T00:00:00Z"
+        )
+        refreshable = RefreshableCredentials.create_from_metadata(metadata, lambda: metadata, "assume-role")
+        send_message = mocker.spy(sqs, "send_message")
+
+        async def scenario():
+            aclient = AsyncClient(sqs, max_pool_connections=20)
+            try:
+                await asyncio.gather(
+                    *(aclient.call("send_message", QueueUrl=url, MessageBody=f"message{i}") for i in range(30))
+                )
+                assert aclient._executor is None and aclient._aio_client.meta.config.max_pool_connections == 20
+                assert aclient._aio_client.meta.endpoint_url == sqs.meta.endpoint_url
+                credentials = await aclient._aio_client._get_credentials().get_frozen_credentials()
+                assert credentials.access_key == "role-key"
+                attributes = await aclient.call("get_queue_attributes", QueueUrl=url, AttributeNames=["All"])
+                return int(attributes["Attributes"]["ApproximateNumberOfMessages"])
+            finally:
+                await aclient.close()
+
+        async def refreshed_key():
+            sqs._request_signer._credentials = refreshable
+            aclient = AsyncClient(sqs)
+            try:
+                await aclient.call("get_queue_url", QueueName="my-queue")
+                return (await aclient._aio_client._get_credentials().get_frozen_credentials()).access_key
+            finally:
+                await aclient.close()
+
+        assert run(scenario()) == 30
+        assert run(refreshed_key()) == "refreshed-key"
+        assert send_message.call_count == 0
+    finally:
+        moto_server.stop()
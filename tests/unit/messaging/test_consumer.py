@@ -0,0 +1,65 @@
+import os
+import time
+from threading import Event, Lock
+from oob.messaging.consumer import SQSConsumer
+from oob.messaging.sqs import SQSQueue
+from boto3 import client
+from moto import mock_sqs
+
+
+@mock_sqs
+def test_sqs_consumer(mocker):
+    sqs = client("sqs", region_name="eu-west-1")
+    sqs.create_queue(QueueName="my-queue")
+    queue = SQSQueue(name="my-queue", account=os.getenv("AWS_ACCOUNT_ID"), region=os.getenv("AWS_DEFAULT_REGION"))
+    for i in range(30):
+        queue.send_message(f"message{i}")
+    delete_message_batch = mocker.spy(SQSQueue.client, "delete_message_batch")
+    change_visibility = mocker.spy(SQSQueue.client, "change_message_visibility_batch")
+    handled, lock = [], Lock()
+
+    def handler(message):
+        if message.body == "message7":
+            raise ValueError("poison message")
+        if message.body == "message3":
+            time.sleep(0.5)
+        with lock:
+            handled.append(message.body)
+
+    with SQSConsumer(queue, handler, max_workers=4, pollers=2, wait_time=1, heartbeat_interval=0.1) as consumer:
+        deadline = time.monotonic() + 10
+        while consumer.processed + consumer.failed < 30 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    assert (consumer.processed, consumer.failed) == (29, 1)
+    assert sorted(handled) == sorted(f"message{i}" for i in range(30) if i != 7)
+    deleted = [e for c in delete_message_batch.call_args_list for e in c.kwargs["Entries"]]
+    assert len(deleted) == 29
+    assert all(len(c.kwargs["Entries"]) <= 10 for c in delete_message_batch.call_args_list)
+    assert change_visibility.call_count >= 1
+    assert all(e["VisibilityTimeout"] == 30 for c in change_visibility.call_args_list for e in c.kwargs["Entries"])
+    assert int(queue.attributes.approximate_number_of_messages_not_visible) == 1
+    assert int(queue.attributes.approximate_number_of_messages) == 0
+
+
+def test_sqs_consumer_stop_during_long_poll(mocker):
+    queue = mocker.Mock(url="https://sqs.eu-west-1.amazonaws.com/123456789012/my-queue")
+    queue._receive_request.return_value = {}
+    queue.change_message_visibility_batch.return_value = {"Successful": [], "Failed": []}
+    polling, answer = Event(), Event()
+
+    def receive_message(**kwargs):
+        polling.set()
+        answer.wait(5)
+        return {"Messages": [{"MessageId": f"id{i}", "ReceiptHandle": f"handle{i}", "Body": "late"} for i in range(2)]}
+
+    queue.client.receive_message.side_effect = receive_message
+    handler = mocker.Mock()
+    consumer = SQSConsumer(queue, handler, max_workers=2, prefetch=0).start()
+    assert polling.wait(5)
+    consumer.stop(timeout=0.1)
+    answer.set()
+    consumer._threads[0].join(5)
+    assert not consumer._threads[0].is_alive()
+    assert handler.call_count == 0 and consumer._in_flight == {}
+    queue.change_message_visibility_batch.assert_called_once_with(["handle0", "handle1"], 0)
+    assert consumer._acquire(2) == 2
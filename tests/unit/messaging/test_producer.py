@@ -0,0 +1,116 @@
+import os
+import pytest
+from oob.messaging.producer import SQSProducer
+from oob.messaging.sqs import SQSBatchEntryError, SQSQueue
+from boto3 import client
+from moto import mock_sqs
+
+
+@mock_sqs
+def test_sqs_producer(mocker):
+    sqs = client("sqs", region_name="eu-west-1")
+    sqs.create_queue(QueueName="my-queue")
+    queue = SQSQueue(name="my-queue", account=os.getenv("AWS_ACCOUNT_ID"), region=os.getenv("AWS_DEFAULT_REGION"))
+    send_message_batch = mocker.spy(SQSQueue.client, "send_message_batch")
+
+    with SQSProducer(queue, linger=60) as producer:
+        futures = [producer.send(f"message{i}", {"index": i}) for i in range(25)]
+        assert send_message_batch.call_count <= 2
+    assert [len(c.kwargs["Entries"]) for c in send_message_batch.call_args_list] == [10, 10, 5]
+    messages = [f.result() for f in futures]
+    assert len({m.id for m in messages}) == 25 and all(m.body_md5 for m in messages)
+    received = queue.receive_message_batch(30)
+    assert sorted(m.body for m in received) == sorted(f"message{i}" for i in range(25))
+    assert received[0].message_attributes["index"] == str(int(received[0].body[7:]))
+
+    send_message_batch.reset_mock()
+    with SQSProducer(queue, linger=60) as producer:
+        futures = [producer.send("x" * 100 * 1024) for _ in range(5)]
+    assert [len(c.kwargs["Entries"]) for c in send_message_batch.call_args_list] == [2, 2, 1]
+    with pytest.raises(ValueError):
+        producer.send("x" * 257 * 1024)
+
+    send_message_batch.reset_mock()
+    producer = SQSProducer(queue, linger=0.01)
+    future = producer.send("lingering")
+    assert future.result(timeout=5).id
+    assert send_message_batch.call_count == 1
+    producer.close()
+    with pytest.raises(ValueError):
+        producer.send("message", group_id="group")
+
+
+@mock_sqs
+def test_sqs_producer_fifo():
+    sqs = client("sqs", region_name="eu-west-1")
+    sqs.create_queue(QueueName="my-queue.fifo", Attributes={"FifoQueue": "true"})
+    queue = SQSQueue(name="my-queue.fifo", account=os.getenv("AWS_ACCOUNT_ID"), region=os.getenv("AWS_DEFAULT_REGION"))
+
+    with SQSProducer(queue, linger=60, max_workers=4) as producer:
+        assert producer.fifo and producer._executor._max_workers == 1
+        with pytest.raises(ValueError):
+            producer.send("no group")
+        futures = [producer.send(f"message{i}", group_id="group", deduplication_id=str(i)) for i in range(25)]
+    assert len({f.result().id for f in futures}) == 25
+    received = []
+    while True:
+        messages = queue.receive_message_batch(10, wait_time=0)
+        if not messages:
+            break
+        received.extend(m.body for m in messages)
+        queue.delete_message_batch([m.receipt_handle for m in messages])
+    assert received == [f"message{i}" for i in range(25)]
+
+
+def test_sqs_producer_retries(mocker):
+    queue = mocker.Mock(url="https://sqs.eu-west-1.amazonaws.com/123456789012/my-queue")
+    responses = iter(
+        [
+            {
+                "Successful": [{"Id": "0", "MessageId": "id-a", "MD5OfMessageBody": "md5"}],
+                "Failed": [
+                    {"Id": "1", "Code": "InternalError", "SenderFault": False, "Message": "retry me"},
+                    {"Id": "2", "Code": "InvalidParameterValue", "SenderFault": True, "Message": "bad"},
+                ],
+            },
+            {"Successful": [{"Id": "0", "MessageId": "id-b", "MD5OfMessageBody": "md5"}]},
+        ]
+    )
+    queue.client.send_message_batch.side_effect = lambda **kwargs: next(responses)
+
+    with SQSProducer(queue, linger=60, retry_delay=0) as producer:
+        a, b, c = producer.send("a"), producer.send("b"), producer.send("c")
+    assert (a.result().id, b.result().id) == ("id-a", "id-b")
+    with pytest.raises(SQSBatchEntryError) as error:
+        c.result()
+    assert (error.value.code, error.value.sender_fault) == ("InvalidParameterValue", True)
+    retried = queue.client.send_message_batch.call_args_list[1].kwargs["Entries"]
+    assert retried == [{"Id": "0", "MessageBody": "b"}]
+
+
+def test_sqs_producer_fifo_retries(mocker):
+    queue = mocker.Mock(url="https://sqs.eu-west-1.amazonaws.com/123456789012/my-queue.fifo")
+    failure = {"Code": "InternalError", "SenderFault": False, "Message": "retry me"}
+    responses = iter(
+        [
+            {
+                "Successful": [
+                    {"Id": "1", "MessageId": "id-a1", "MD5OfMessageBody": "md5"},
+                    {"Id": "2", "MessageId": "id-b0", "MD5OfMessageBody": "md5"},
+                ],
+                "Failed": [dict(failure, Id="0"), dict(failure, Id="3")],
+            },
+            {"Successful": [{"Id": "0", "MessageId": "id-b1", "MD5OfMessageBody": "md5"}]},
+        ]
+    )
+    queue.client.send_message_batch.side_effect = lambda **kwargs: next(responses)
+
+    with SQSProducer(queue, linger=60, retry_delay=0) as producer:
+        a0, a1 = producer.send("a0", group_id="a"), producer.send("a1", group_id="a")
+        b0, b1 = producer.send("b0", group_id="b"), producer.send("b1", group_id="b")
+    with pytest.raises(SQSBatchEntryError) as error:
+        a0.result()
+    assert error.value.code == "InternalError"
+    assert (a1.result().id, b0.result().id, b1.result().id) == ("id-a1", "id-b0", "id-b1")
+    retried = queue.client.send_message_batch.call_args_list[1].kwargs["Entries"]
+    assert retried == [{"Id": "0", "MessageBody": "b1", "MessageGroupId": "b"}]
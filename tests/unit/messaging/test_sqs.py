@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 # pylint: disable=unused-argument
 """Test base objects."""
+
 from oob.messaging.sqs import SQSMessage, SQSQueue
 from oob.utils import underscore_namedtuple
 from boto3 import client
@@ -94,3 +95,56 @@ def test_sqs_queue():
     queue.delete_message_batch([m.receipt_handle for m in messages])
 
     assert queue.number_of_messages == 0
+
+
+@mock_sqs
+def test_receive_message_batch(mocker):
+    sqs = client("sqs", region_name="eu-west-1")
+    sqs.create_queue(QueueName="my-queue")
+    queue = SQSQueue(name="my-queue", account=os.getenv("AWS_ACCOUNT_ID"), region=os.getenv("AWS_DEFAULT_REGION"))
+    for i in range(25):
+        queue.send_message(f"message{i}")
+    get_queue_attributes = mocker.spy(SQSQueue.client, "get_queue_attributes")
+    receive_message = mocker.spy(SQSQueue.client, "receive_message")
+
+    messages = queue.receive_message_batch(22)
+    assert len(messages) == 22
+    assert [c.kwargs["MaxNumberOfMessages"] for c in receive_message.call_args_list] == [10, 10, 2]
+    assert receive_message.call_args.kwargs["WaitTimeSeconds"] == 1
+
+    receive_message.reset_mock()
+    messages = queue.receive_message_batch(10)
+    assert len(messages) == 3
+    assert receive_message.call_count == 2
+
+    receive_message.reset_mock()
+    assert queue.receive_message_batch(10, wait_time=20, timeout=0) == []
+    assert receive_message.call_count == 0
+    assert get_queue_attributes.call_count == 0
+
+    partial_responses = [{"Messages": [{"Body": f"message{i}"} for i in range(n)]} for n in (3, 1, 0)]
+    receive_message = mocker.patch.object(SQSQueue.client, "receive_message", side_effect=partial_responses)
+    messages = queue.receive_message_batch(100, wait_time=20)
+    assert len(messages) == 4
+    assert [c.kwargs["MaxNumberOfMessages"] for c in receive_message.call_args_list] == [10, 10, 10]
+
+
+@mock_sqs
+def test_batch_failures(mocker):
+    client("sqs", region_name="eu-west-1").create_queue(QueueName="my-queue")
+    queue = SQSQueue(name="my-queue", account=os.getenv("AWS_ACCOUNT_ID"), region=os.getenv("AWS_DEFAULT_REGION"))
+    delete_message_batch = mocker.patch.object(
+        SQSQueue.client,
+        "delete_message_batch",
+        side_effect=[
+            {"Successful": [{"Id": str(i)} for i in range(9)], "Failed": [{"Id": "9", "SenderFault": True}]},
+            {"Successful": [{"Id": "10"}], "Failed": [{"Id": "11", "SenderFault": True}]},
+        ],
+    )
+    response = queue.delete_message_batch([f"handle{i}" for i in range(12)])
+    assert [f["Id"] for f in response["Failed"]] == ["9", "11"]
+    assert len(response["Successful"]) == 10
+    assert delete_message_batch.call_args.kwargs["Entries"] == [
+        {"ReceiptHandle": "handle10", "Id": "10"},
+        {"ReceiptHandle": "handle11", "Id": "11"},
+    ]
@@ -0,0 +1,43 @@
+from oob.s3 import S3Object
+from oob.s3.cache import S3DiskCache
+from boto3 import client
+from moto import mock_s3
+
+
+@mock_s3
+def test_s3_disk_cache(tmpdir, mocker):
+    s3 = client("s3", region_name="eu-west-1")
+    s3.create_bucket(Bucket="my-bucket", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    s3.put_object(Bucket="my-bucket", Key="ref/a.csv", Body=b"a" * 10)
+    s3.put_object(Bucket="my-bucket", Key="ref/b.csv", Body=b"b" * 10)
+    cache = S3DiskCache(root=str(tmpdir.join("cache")), max_size=15)
+    get_object = mocker.spy(S3Object.client, "get_object")
+
+    obj = S3Object("my-bucket", "ref/a.csv")
+    assert obj.download_fileobj(cache=cache).read() == b"a" * 10
+    assert (cache.hits, cache.misses, get_object.call_count) == (0, 1, 1)
+
+    obj.download_to(str(tmpdir.join("a.csv")), cache=cache)
+    assert tmpdir.join("a.csv").read() == "a" * 10
+    assert (cache.hits, cache.not_modified, get_object.call_count) == (1, 1, 2)
+
+    obj.refresh()
+    cache.get(obj)
+    assert (cache.hits, get_object.call_count) == (2, 2)
+
+    s3.put_object(Bucket="my-bucket", Key="ref/a.csv", Body=b"A" * 10)
+    with open(cache.get(S3Object("my-bucket", "ref/a.csv"))) as f:
+        assert f.read() == "A" * 10
+    assert (cache.misses, len(tmpdir.join("cache").listdir())) == (2, 1)
+
+    cache.get(S3Object("my-bucket", "ref/b.csv"))
+    assert (cache.evictions, cache.size, len(tmpdir.join("cache").listdir())) == (1, 10, 1)
+
+    reloaded = S3DiskCache(root=str(tmpdir.join("cache")), validate_after=60)
+    assert reloaded.size == 10
+    reloaded.get(S3Object("my-bucket", "ref/b.csv"))
+    reloaded.get(S3Object("my-bucket", "ref/b.csv"))
+    assert (reloaded.hits, reloaded.not_modified, reloaded.misses) == (2, 1, 0)
+
+    reloaded.clear()
+    assert tmpdir.join("cache").listdir() == []
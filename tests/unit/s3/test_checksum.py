@@ -0,0 +1,95 @@
+import pytest
+from hashlib import sha256
+from oob.s3 import S3Bucket, S3Object, checksum as checksum_module
+from oob.s3.checksum import S3ChecksumError, checksum, composite_checksum, encode, new_checksum
+from boto3 import client
+from botocore.response import StreamingBody
+from io import BytesIO
+from moto import mock_s3
+
+requires_crc32c = pytest.mark.skipif(checksum_module._crc32c is None, reason="crc32c or awscrt is not installed")
+
+
+def test_checksums(mocker):
+    assert checksum(b"123456789", "CRC32") == encode(bytes.fromhex("cbf43926"))
+    assert checksum(b"abc", "SHA256") == encode(sha256(b"abc").digest())
+    crc = new_checksum("CRC32")
+    crc.update(b"1234")
+    crc.update(b"56789")
+    assert encode(crc.digest()) == checksum(b"123456789", "CRC32")
+    mocker.patch.object(checksum_module, "_crc32c", None)
+    with pytest.raises(ImportError):
+        new_checksum("CRC32C")
+    digests = [sha256(b"a").digest(), sha256(b"b").digest()]
+    assert composite_checksum(digests, "SHA256") == checksum(b"".join(digests), "SHA256") + "-2"
+    with pytest.raises(ValueError):
+        new_checksum("MD5")
+
+
+@requires_crc32c
+def test_crc32c():
+    assert checksum(b"123456789", "CRC32C") == encode(bytes.fromhex("e3069283"))
+    crc = new_checksum("CRC32C")
+    crc.update(b"1234")
+    crc.update(b"56789")
+    assert encode(crc.digest()) == checksum(b"123456789", "CRC32C")
+
+
+@pytest.mark.parametrize("algorithm", ["CRC32", pytest.param("CRC32C", marks=requires_crc32c)])
+@mock_s3
+def test_resumable_upload_checksum(tmpdir, mocker, algorithm):
+    s3 = client("s3", region_name="eu-west-1")
+    s3.create_bucket(Bucket="my-bucket", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    bucket_manager = S3Bucket(name="my-bucket")
+    p = tmpdir.join("large.bin")
+    p.write_binary(b"a" * (5 * 2**20) + b"b" * 10)
+    upload_part = mocker.spy(S3Bucket.client, "upload_part")
+    complete = mocker.spy(S3Bucket.client, "complete_multipart_upload")
+
+    bucket_manager.upload_file_resumable(str(p), "large.bin", part_size=5 * 2**20, checksum_algorithm=algorithm)
+    sent = {c.kwargs["PartNumber"]: c.kwargs[f"Checksum{algorithm}"] for c in upload_part.call_args_list}
+    assert sent == {1: checksum(b"a" * (5 * 2**20), algorithm), 2: checksum(b"b" * 10, algorithm)}
+    parts = complete.call_args.kwargs["MultipartUpload"]["Parts"]
+    assert [part[f"Checksum{algorithm}"] for part in parts] == [sent[1], sent[2]]
+
+
+def fake_object(mocker, parts, stored):
+    data = b"".join(parts)
+    offsets = [sum(len(p) for p in parts[:i]) for i in range(len(parts))]
+
+    def get_object(Bucket, Key, IfMatch, PartNumber=None):
+        assert IfMatch == '"etag"'
+        if PartNumber is None:
+            return {"Body": StreamingBody(BytesIO(data), len(data))}
+        part = parts[PartNumber - 1]
+        start = offsets[PartNumber - 1]
+        content_range = f"bytes {start}-{start + len(part) - 1}/{len(data)}"
+        return {"Body": StreamingBody(BytesIO(part), len(part)), "ContentRange": content_range}
+
+    mocker.patch.object(S3Object.client, "head_object", return_value={"ETag": '"etag"', **stored})
+    return mocker.patch.object(S3Object.client, "get_object", side_effect=get_object)
+
+
+def test_download_verified(tmpdir, mocker):
+    obj = S3Object("my-bucket", "data.bin")
+    dest = str(tmpdir.join("data.bin"))
+
+    fake_object(mocker, [b"hello world"], {"ChecksumSHA256": checksum(b"hello world", "SHA256")})
+    assert obj.download_to(dest, verify_checksum=True) == checksum(b"hello world", "SHA256")
+    assert tmpdir.join("data.bin").read_binary() == b"hello world"
+
+    parts = [b"x" * 1000, b"y" * 1000, b"z" * 10]
+    digests = [sha256(p).digest() for p in parts]
+    get_object = fake_object(mocker, parts, {"ChecksumSHA256": composite_checksum(digests, "SHA256")})
+    obj.download_to(dest, verify_checksum=True, max_workers=3)
+    assert tmpdir.join("data.bin").read_binary() == b"".join(parts)
+    assert sorted(c.kwargs["PartNumber"] for c in get_object.call_args_list) == [1, 2, 3]
+
+    fake_object(mocker, parts, {"ChecksumSHA256": composite_checksum(digests[::-1], "SHA256")})
+    with pytest.raises(S3ChecksumError):
+        obj.download_to(dest, verify_checksum=True)
+    assert not tmpdir.join("data.bin").exists()
+
+    fake_object(mocker, parts, {})
+    with pytest.raises(S3ChecksumError):
+        obj.download_to(dest, verify_checksum=True)
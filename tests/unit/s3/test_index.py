@@ -0,0 +1,68 @@
+import gzip
+import json
+from datetime import datetime, timezone
+from oob.s3 import S3Bucket
+from boto3 import client
+from moto import mock_s3
+
+
+@mock_s3
+def test_key_index(tmpdir, mocker):
+    s3 = client("s3", region_name="eu-west-1")
+    s3.create_bucket(Bucket="my-bucket", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    for day in range(1, 4):
+        for i in range(5):
+            s3.put_object(Bucket="my-bucket", Key=f"logs/2021-01-0{day}/{i}.json.gz", Body=b"x" * i)
+    s3.put_object(Bucket="my-bucket", Key="other/readme.txt", Body=b"readme")
+    bucket_manager = S3Bucket(name="my-bucket")
+
+    with bucket_manager.key_index(str(tmpdir.join("index.sqlite"))) as index:
+        assert index.refresh("logs/") == 15
+        assert len(index) == 15
+        list_objects = mocker.spy(S3Bucket.client, "list_objects_v2")
+        assert index.keys("logs/2021-01-02/") == [f"logs/2021-01-02/{i}.json.gz" for i in range(5)]
+        assert len(index.keys(suffix=".gz", min_size=3)) == 6
+        assert index.keys("logs/", max_size=0, limit=2) == ["logs/2021-01-01/0.json.gz", "logs/2021-01-02/0.json.gz"]
+        assert index.keys(modified_before=datetime(2000, 1, 1, tzinfo=timezone.utc)) == []
+        (s3object,) = index.objects("logs/2021-01-03/4")
+        assert (s3object.size, s3object.etag) == (4, s3.head_object(Bucket="my-bucket", Key=s3object.key)["ETag"])
+        assert list_objects.call_count == 0
+
+        s3.put_object(Bucket="my-bucket", Key="logs/2021-01-04/0.json.gz", Body=b"")
+        s3.delete_object(Bucket="my-bucket", Key="logs/2021-01-01/0.json.gz")
+        assert index.refresh("logs/", append_only=True) == 1
+        assert len(index) == 16
+        assert index.refresh("logs/") == 15
+        assert "logs/2021-01-01/0.json.gz" not in index.keys("logs/")
+        index.refresh()
+        assert len(index) == 16
+
+
+@mock_s3
+def test_key_index_inventory(tmpdir):
+    s3 = client("s3", region_name="eu-west-1")
+    s3.create_bucket(Bucket="my-bucket", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    s3.create_bucket(Bucket="inventory", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    rows = [
+        '"my-bucket","data/a%20b.csv","10","2021-01-20T10:00:00.000Z","0cc175b9c0f1b6a831c399e269772661","STANDARD"',
+        '"my-bucket","data/c.csv","20","2021-01-21T10:00:00.000Z","92eb5ffee6ae2fec3ad71c777531578f","GLACIER"',
+        '"my-bucket","other/d+e.csv","1","2021-01-22T10:00:00.000Z","0cc175b9c0f1b6a831c399e269772661","STANDARD"',
+        '"my-bucket","other/f%2Bg.csv","1","2021-01-22T10:00:00.000Z","0cc175b9c0f1b6a831c399e269772661","STANDARD"',
+    ]
+    s3.put_object(Bucket="inventory", Key="my-bucket/data/1.csv.gz", Body=gzip.compress("\n".join(rows).encode()))
+    manifest = {
+        "sourceBucket": "my-bucket",
+        "destinationBucket": "arn:aws:s3:::inventory",
+        "fileFormat": "CSV",
+        "fileSchema": "Bucket, Key, Size, LastModifiedDate, ETag, StorageClass",
+        "files": [{"key": "my-bucket/data/1.csv.gz", "size": 100, "MD5checksum": "x"}],
+    }
+    s3.put_object(Bucket="inventory", Key="my-bucket/manifest.json", Body=json.dumps(manifest).encode())
+    index = S3Bucket(name="my-bucket").key_index(str(tmpdir.join("index.sqlite")))
+
+    assert index.load_inventory("s3://inventory/my-bucket/manifest.json") == 4
+    assert index.keys("other/") == ["other/d e.csv", "other/f+g.csv"]
+    a, c = index.objects("data/")
+    assert (a.key, a.size, a.etag) == ("data/a b.csv", 10, '"0cc175b9c0f1b6a831c399e269772661"')
+    assert (c.storage_class, c.last_modified) == ("GLACIER", datetime(2021, 1, 21, 10, tzinfo=timezone.utc))
+    assert index.keys("data/", modified_after=datetime(2021, 1, 21, tzinfo=timezone.utc)) == ["data/c.csv"]
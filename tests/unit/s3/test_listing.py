@@ -0,0 +1,60 @@
+from oob.s3 import S3Bucket
+from oob.s3.listing import S3ParallelLister
+from boto3 import client
+from moto import mock_s3
+
+
+@mock_s3
+def test_parallel_lister():
+    s3 = client("s3", region_name="eu-west-1")
+    s3.create_bucket(Bucket="my-bucket", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    keys = ["events/_SUCCESS", "events/readme.txt", "other/file.txt"]
+    for day in range(3):
+        for hour in range(4):
+            for i in range(3):
+                keys.append(f"events/dt=2021-01-0{day + 1}/hour={hour:02d}/part-{i}.json")
+    for key in keys:
+        s3.put_object(Bucket="my-bucket", Key=key, Body=b"{}")
+    bucket_manager = S3Bucket(name="my-bucket")
+    expected = sorted(k for k in keys if k.startswith("events/"))
+
+    ordered = [o.key for o in bucket_manager.iter_objects_parallel(prefix="events/", max_workers=4)]
+    assert ordered == expected
+
+    arrival = [o.key for o in bucket_manager.iter_objects_parallel(prefix="events/", max_workers=4, ordered=False)]
+    assert sorted(arrival) == expected
+
+    lister = S3ParallelLister(bucket_manager, prefix="events/", max_workers=2, min_shards=2, max_depth=1)
+    assert [o.key for o in lister] == expected
+    assert [o.key for o in S3ParallelLister(bucket_manager, max_depth=0)] == sorted(keys)
+    assert [o.key for o in S3ParallelLister(bucket_manager, max_depth=10)] == sorted(keys)
+
+    stream = bucket_manager.iter_objects_parallel(prefix="events/", max_workers=2)
+    assert next(stream).key == expected[0]
+    stream.close()
+
+
+@mock_s3
+def test_parallel_lister_flat_levels(mocker):
+    s3 = client("s3", region_name="eu-west-1")
+    s3.create_bucket(Bucket="my-bucket", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    keys = ["events/_SUCCESS", "events/readme.txt"] + [f"events/a{i}.json" for i in range(5)]
+    keys += [f"events/dt=2021-01-0{day}/part-{i}.json" for day in range(1, 4) for i in range(3)]
+    for key in keys:
+        s3.put_object(Bucket="my-bucket", Key=key, Body=b"{}")
+    bucket_manager = S3Bucket(name="my-bucket")
+
+    lister = S3ParallelLister(bucket_manager, prefix="events/", max_workers=2, min_shards=100, page_size=2)
+    assert [o.key for o in lister] == sorted(keys)
+    arrival = S3ParallelLister(bucket_manager, prefix="events/", max_workers=2, ordered=False, page_size=2)
+    assert sorted(o.key for o in arrival) == sorted(keys)
+
+    for i in range(100):
+        s3.put_object(Bucket="my-bucket", Key=f"flat/file_{i:03d}.json", Body=b"{}")
+    list_objects = mocker.spy(S3Bucket.client, "list_objects_v2")
+    stream = iter(S3ParallelLister(bucket_manager, prefix="flat/", max_workers=2, page_size=10, queue_size=1))
+    assert next(stream).key == "flat/file_000.json"
+    assert list_objects.call_count <= 4
+    assert list_objects.call_args_list[1][1]["StartAfter"] == "flat/file_009.json"
+    assert [o.key for o in stream] == [f"flat/file_{i:03d}.json" for i in range(1, 100)]
+    assert list_objects.call_count == 10
@@ -0,0 +1,46 @@
+import datetime
+from urllib.parse import parse_qsl, urlsplit
+from boto3 import client, Session
+from botocore.config import Config
+from oob.s3.presign import S3Presigner
+
+CREDENTIALS = {"aws_access_key_id": "AKID", "aws_secret_access_key": "secret"}
+KEYS = ["a.txt", "dir/sub dir/é+x=1&y~z.csv", "weird%2F/key"]
+
+
+def parts(url):
+    url = urlsplit(url)
+    return url.netloc, url.path, sorted(parse_qsl(url.query))
+
+
+def test_presign_many(mocker):
+    mocker.patch("botocore.auth.get_current_datetime", return_value=datetime.datetime(2021, 1, 20, 10))
+    mocker.patch("botocore.auth.time.time", return_value=1611136800)
+    for config, kwargs in [
+        (Config(signature_version="s3"), {}),
+        (Config(signature_version="s3"), {"aws_session_token": "token"}),
+        (Config(signature_version="s3v4"), {}),
+        (Config(signature_version="s3v4"), {"aws_session_token": "token"}),
+        (Config(signature_version="s3v4", s3={"addressing_style": "path"}), {"endpoint_url": "http://localhost:5000"}),
+    ]:
+        s3 = client("s3", "eu-west-1", config=config, **CREDENTIALS, **kwargs)
+        for method, client_method in (("GET", "get_object"), ("PUT", "put_object")):
+            presigner = S3Presigner(s3, "my-bucket", method, expires=900)
+            assert presigner.signature_version == config.signature_version
+            urls = presigner.presign_many(KEYS)
+            for key in KEYS:
+                expected = s3.generate_presigned_url(
+                    client_method, Params={"Bucket": "my-bucket", "Key": key}, ExpiresIn=900
+                )
+                assert parts(urls[key]) == parts(expected)
+
+
+def test_presign_many_signs_locally(mocker):
+    mocker.patch("botocore.auth.get_current_datetime", return_value=datetime.datetime(2021, 1, 20, 10))
+    session = Session(**CREDENTIALS)
+    s3 = session.client("s3", "eu-west-1", config=Config(signature_version="s3v4"))
+    generate_presigned_url = mocker.spy(s3, "generate_presigned_url")
+    presigner = S3Presigner(s3, "my-bucket", credentials=session.get_credentials())
+    urls = presigner.presign_many(f"data/part-{i:04d}.csv" for i in range(500))
+    assert len(urls) == 500 and generate_presigned_url.call_count == 1
+    assert parts(urls["data/part-0001.csv"]) == parts(S3Presigner(s3, "my-bucket").presign("data/part-0001.csv"))
@@ -0,0 +1,61 @@
+import io
+import zipfile
+from oob.s3 import S3Object
+from oob.s3.reader import S3ObjectReader
+from boto3 import client
+from moto import mock_s3
+
+
+@mock_s3
+def test_s3_object_reader():
+    s3 = client("s3", region_name="eu-west-1")
+    s3.create_bucket(Bucket="my-bucket", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    content = bytes(range(256)) * 400
+    s3.put_object(Bucket="my-bucket", Key="data.bin", Body=content)
+    obj = S3Object("my-bucket", "data.bin")
+
+    reader = S3ObjectReader(obj, block_size=4096, cache_blocks=3, readahead=2)
+    assert reader.size == len(content)
+    assert reader.read(10) == content[:10]
+    assert reader.seek(-100, io.SEEK_END) == len(content) - 100
+    assert reader.read() == content[-100:]
+    assert reader.read() == b""
+    reader.seek(5000)
+    assert reader.read(5000) == content[5000:10000]
+    reader.seek(0)
+    assert reader.readall() == content
+    assert len(reader._cache) <= 3
+    requests = reader.requests
+    reader.seek(len(content) - 10)
+    reader.read(5)
+    assert reader.requests == requests
+    reader.close()
+    assert reader.closed
+
+    with obj.open(block_size=1000, readahead=0) as f:
+        assert f.read() == content
+        f.seek(12345)
+        assert f.read(3) == content[12345:12348]
+
+
+@mock_s3
+def test_s3_object_open_formats():
+    s3 = client("s3", region_name="eu-west-1")
+    s3.create_bucket(Bucket="my-bucket", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    lines = [f"{i};value_{i}\n" for i in range(1000)]
+    s3.put_object(Bucket="my-bucket", Key="data.csv", Body="".join(lines).encode())
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zfh:
+        zfh.writestr("data.csv", "".join(lines))
+    s3.put_object(Bucket="my-bucket", Key="data.zip", Body=archive.getvalue())
+
+    with S3Object("my-bucket", "data.csv").open("r", block_size=1024) as f:
+        assert f.readlines() == lines
+    with S3Object("my-bucket", "data.zip").open(block_size=1024) as f:
+        with zipfile.ZipFile(f).open("data.csv") as member:
+            assert member.read().decode() == "".join(lines)
+    try:
+        S3Object("my-bucket", "data.csv").open("wb")
+        assert False
+    except ValueError:
+        pass
@@ -0,0 +1,58 @@
+from oob.s3 import S3Bucket, S3Object
+from oob.s3.restore import AVAILABLE, IN_PROGRESS, PENDING, FAILED
+from boto3 import client
+from moto import mock_s3
+
+
+@mock_s3
+def test_restore_object():
+    s3 = client("s3", region_name="eu-west-1")
+    s3.create_bucket(Bucket="my-bucket", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    s3.put_object(Bucket="my-bucket", Key="archive/a", Body=b"a", StorageClass="GLACIER")
+    s3object = S3Object("my-bucket", "archive/a")
+    assert s3object.restore_status == PENDING
+    s3object.restore_object(days=2, tier="Bulk")
+    assert s3object.restore_status == AVAILABLE
+    assert s3object.attributes.restore.startswith('ongoing-request="false"')
+
+
+@mock_s3
+def test_batch_restore(tmpdir, mocker):
+    s3 = client("s3", region_name="eu-west-1")
+    s3.create_bucket(Bucket="my-bucket", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    for i in range(6):
+        s3.put_object(Bucket="my-bucket", Key=f"archive/{i}", Body=f"data {i}".encode(), StorageClass="GLACIER")
+    s3.put_object(Bucket="my-bucket", Key="archive/standard", Body=b"standard")
+    bucket_manager = S3Bucket(name="my-bucket")
+    sleep = mocker.patch("oob.s3.restore.sleep")
+    head_object = S3Bucket.client.head_object
+    heads = []
+
+    def slow_restore(**kwargs):
+        heads.append(kwargs["Key"])
+        if kwargs["Key"] == "archive/5" and heads.count("archive/5") == 2:
+            raise ConnectionError("network down")
+        response = head_object(**kwargs)
+        if heads.count(kwargs["Key"]) < int(kwargs["Key"][-1]) % 3 + 1:
+            response["Restore"] = 'ongoing-request="true"'
+        return response
+
+    mocker.patch.object(S3Bucket.client, "head_object", side_effect=slow_restore)
+    restore = bucket_manager.restore_objects("archive/", days=1, tier="Bulk", max_workers=4)
+    assert sorted(restore.keys_with_status(IN_PROGRESS)) == [f"archive/{i}" for i in range(6)]
+
+    events = list(restore.download_available(str(tmpdir), poll_interval=1, max_interval=3))
+    assert sorted(e.key for e in events if e.status == AVAILABLE and e.error is None) == [
+        f"archive/{i}" for i in range(5)
+    ]
+    failed = [e for e in events if e.status == FAILED]
+    assert [e.key for e in failed] == ["archive/5"] and isinstance(failed[0].error, ConnectionError)
+    assert tmpdir.join("archive", "4").read() == "data 4"
+    assert [c.args[0] for c in sleep.call_args_list] == [1, 2, 3]
+    assert len(heads) == 6 + 4 + 1
+
+    restore = bucket_manager.restore_objects(["archive/standard", S3Object("my-bucket", "missing")])
+    assert restore.states == {"archive/standard": AVAILABLE, "missing": FAILED}
+    events = list(restore.download_available())
+    assert [(e.key, e.status) for e in events] == [("missing", FAILED), ("archive/standard", AVAILABLE)]
+    assert events[1].download.data == b"standard"
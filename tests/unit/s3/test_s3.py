@@ -1,4 +1,5 @@
-from oob.s3 import S3Bucket, S3Object
+import pytest
+from oob.s3 import S3Bucket, S3Object, clear_bucket_regions
 from boto3 import client
 from moto import mock_s3
 
@@ -87,3 +88,250 @@ def test_list_bucket():
 
     bucket_manager.delete_objects(prefix="prefix/")
     assert len(bucket_manager.list_keys("prefix/")) == 0
+
+
+@mock_s3
+def test_object_attributes_cache(mocker):
+    s3 = client("s3", region_name="eu-west-1")
+    s3.create_bucket(Bucket="my-bucket", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    s3.put_object(Bucket="my-bucket", Key="file.txt", Body=b"test")
+    head_object = mocker.spy(S3Object.client, "head_object")
+
+    missing = S3Object("my-bucket", "missing.txt")
+    assert missing.filename == "missing.txt"
+    assert head_object.call_count == 0
+
+    obj = S3Object("my-bucket", "file.txt")
+    assert obj.attributes.content_length == 4
+    assert obj.attributes.content_length == 4
+    assert head_object.call_count == 1
+
+    s3.put_object(Bucket="my-bucket", Key="file.txt", Body=b"test2")
+    assert obj.refresh().content_length == 5
+    assert head_object.call_count == 2
+
+    obj = S3Object("my-bucket", "file.txt", attributes_ttl=0)
+    obj.attributes
+    obj.attributes
+    assert head_object.call_count == 4
+
+    obj = S3Object("my-bucket", "file.txt", head={"ContentLength": 5})
+    assert obj.attributes.content_length == 5
+    assert head_object.call_count == 4
+
+
+@mock_s3
+def test_iter_objects(mocker):
+    s3 = client("s3", region_name="eu-west-1")
+    s3.create_bucket(Bucket="my-bucket", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    for i in range(15):
+        s3.put_object(Bucket="my-bucket", Key=f"prefix/file_{i:02d}.txt", Body=b"x" * i)
+    bucket_manager = S3Bucket(name="my-bucket")
+    head_object = mocker.spy(S3Object.client, "head_object")
+    list_objects = mocker.spy(S3Object.client, "list_objects_v2")
+
+    objects = list(bucket_manager.iter_objects(prefix="prefix/", page_size=4))
+    assert [o.key for o in objects] == [f"prefix/file_{i:02d}.txt" for i in range(15)]
+    assert [o.size for o in objects] == list(range(15))
+    assert all(o.etag and o.last_modified and o.storage_class == "STANDARD" for o in objects)
+    assert list_objects.call_count == 4
+    assert head_object.call_count == 0
+
+    assert len(list(bucket_manager.iter_objects(max_keys=5, page_size=2))) == 5
+    assert [o.key for o in bucket_manager.iter_objects(start_after="prefix/file_12.txt")] == [
+        "prefix/file_13.txt",
+        "prefix/file_14.txt",
+    ]
+
+
+@mock_s3
+def test_delete_objects_concurrently(mocker):
+    s3 = client("s3", region_name="eu-west-1")
+    s3.create_bucket(Bucket="my-bucket", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    for i in range(2100):
+        s3.put_object(Bucket="my-bucket", Key=f"prefix/file_{i}.txt", Body=b"")
+    s3.put_object(Bucket="my-bucket", Key="other/file.txt", Body=b"")
+    bucket_manager = S3Bucket(name="my-bucket")
+
+    summary = bucket_manager.delete_objects(prefix="prefix/", max_workers=4)
+    assert (summary.deleted, summary.batches, summary.errors) == (2100, 3, [])
+    assert bucket_manager.list_keys() == ["other/file.txt"]
+
+    error = {"Key": "other/file.txt", "Code": "InternalError", "Message": "retry"}
+    responses = iter([{"Errors": [error]}, {}])
+    mocker.patch.object(S3Bucket.client, "delete_objects", side_effect=lambda **kwargs: next(responses))
+    summary = bucket_manager.delete_objects(keys=iter(["other/file.txt"]), max_workers=2, retry_delay=0)
+    assert (summary.deleted, summary.retries, summary.errors) == (1, 1, [])
+
+    mocker.patch.object(S3Bucket.client, "delete_objects", return_value={"Errors": [error]})
+    summary = bucket_manager.delete_objects(keys=["other/file.txt"], max_workers=2, max_retries=2, retry_delay=0)
+    assert (summary.deleted, summary.retries, summary.errors) == (0, 2, [error])
+
+
+@mock_s3
+def test_delete_objects():
+    s3 = client("s3", region_name="eu-west-1")
+    s3.create_bucket(Bucket="my-bucket", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    for i in range(1200):
+        s3.put_object(Bucket="my-bucket", Key=f"prefix/file_{i}.txt", Body=b"")
+    s3.put_object(Bucket="my-bucket", Key="other/file.txt", Body=b"")
+    bucket_manager = S3Bucket(name="my-bucket")
+
+    with pytest.raises(ValueError):
+        bucket_manager.delete_objects()
+    with pytest.raises(ValueError):
+        bucket_manager.delete_objects(prefix="")
+    with pytest.raises(ValueError):
+        bucket_manager.delete_objects(keys=["other/file.txt"], prefix="prefix/")
+    responses = bucket_manager.delete_objects(keys=(f"prefix/file_{i}.txt" for i in range(1100)))
+    assert [len(r["Deleted"]) for r in responses] == [1000, 100]
+    assert len(bucket_manager.list_keys("prefix/")) == 100
+    with pytest.raises(ValueError):
+        bucket_manager.delete_objects(keys=["prefix/file_1100.txt"], prefix="")
+    assert len(bucket_manager.list_keys()) == 101
+    bucket_manager.delete_objects(whole_bucket=True)
+    assert bucket_manager.list_keys() == []
+
+
+@mock_s3
+def test_upload_file_consistency(tmpdir, mocker):
+    import io
+    from botocore.exceptions import ClientError
+
+    s3 = client("s3", region_name="eu-west-1")
+    s3.create_bucket(Bucket="my-bucket", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    bucket_manager = S3Bucket(name="my-bucket")
+    p = tmpdir.join("local.txt")
+    p.write("test")
+    head_object = S3Bucket.client.head_object
+    spy = mocker.spy(S3Bucket.client, "head_object")
+
+    obj = bucket_manager.upload_file(str(p), "strong.txt")
+    assert (obj.key, obj.size, spy.call_count) == ("strong.txt", 4, 0)
+    assert bucket_manager.upload_file(io.BytesIO(b"test"), "none.txt", consistent_write=False) is None
+
+    missing = ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject")
+    responses = iter([missing, missing])
+
+    def eventually_consistent_head(**kwargs):
+        response = next(responses, None)
+        if response:
+            raise response
+        return head_object(**kwargs)
+
+    mocker.patch.object(S3Bucket.client, "head_object", side_effect=eventually_consistent_head)
+    obj = bucket_manager.upload_file(str(p), "verify.txt", consistent_write="verify")
+    assert obj.attributes.content_length == 4
+
+    responses = iter([missing] * 100)
+    try:
+        bucket_manager.upload_file(str(p), "verify.txt", consistent_write="verify", wait_timeout=0.2)
+        assert False
+    except ClientError:
+        pass
+
+
+@mock_s3
+def test_copy_and_move_prefix(mocker):
+    from oob.s3 import transfer
+
+    s3 = client("s3", region_name="eu-west-1")
+    s3.create_bucket(Bucket="my-bucket", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    s3.create_bucket(Bucket="archive", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    for i in range(30):
+        s3.put_object(Bucket="my-bucket", Key=f"dt=2021-01-01/part-{i:02d}", Body=b"x" * i)
+    s3.put_object(Bucket="my-bucket", Key="dt=2021-01-01/large", Body=b"y" * (12 * 2**20), ContentType="text/csv")
+    bucket_manager = S3Bucket(name="my-bucket")
+    mocker.patch.object(transfer, "MAX_COPY_SIZE", 10 * 2**20)
+    upload_part_copy = mocker.spy(S3Bucket.client, "upload_part_copy")
+
+    progress = []
+    summary = bucket_manager.copy_prefix(
+        "dt=2021-01-01/", "backup/dt=2021-01-01/", max_workers=4, part_size=5 * 2**20, callback=progress.append
+    )
+    assert (summary.copied, summary.deleted, summary.errors, len(progress)) == (31, 0, [], 31)
+    assert summary.bytes == sum(range(30)) + 12 * 2**20
+    assert upload_part_copy.call_count == 3
+    large = s3.head_object(Bucket="my-bucket", Key="backup/dt=2021-01-01/large")
+    assert (large["ContentLength"], large["ContentType"]) == (12 * 2**20, "text/csv")
+
+    summary = bucket_manager.move_prefix("dt=2021-01-01/", "dt=2021-01-01/", dest_bucket="archive")
+    assert (summary.copied, summary.deleted) == (31, 31)
+    assert bucket_manager.list_keys("dt=") == []
+    assert len(S3Bucket(name="archive").list_keys("dt=2021-01-01/")) == 31
+
+    try:
+        bucket_manager.move_prefix("backup/", "backup/old/")
+        assert False
+    except ValueError:
+        pass
+
+
+@mock_s3
+def test_download_many(tmpdir):
+    s3 = client("s3", region_name="eu-west-1")
+    s3.create_bucket(Bucket="my-bucket", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    for i in range(40):
+        s3.put_object(Bucket="my-bucket", Key=f"shards/{i % 4}/part-{i:02d}", Body=b"x" * i)
+    s3.put_object(Bucket="my-bucket", Key="shards/", Body=b"")
+    bucket_manager = S3Bucket(name="my-bucket")
+
+    events = list(bucket_manager.download_many("shards/", str(tmpdir), max_workers=16))
+    assert len(events) == 40
+    assert all(e.error is None for e in events)
+    assert tmpdir.join("shards", "3", "part-07").read_binary() == b"x" * 7
+    assert sum(e.bytes for e in events) == sum(range(40))
+
+    keys = ["shards/1/part-01", S3Object("my-bucket", "shards/2/part-02"), "missing"]
+    events = {e.key: e for e in bucket_manager.download_many(keys)}
+    assert (events["shards/1/part-01"].data, events["shards/2/part-02"].data) == (b"x", b"xx")
+    assert events["shards/1/part-01"].path is None
+    assert isinstance(events["missing"].error, Exception)
+
+    s3.put_object(Bucket="my-bucket", Key="data/../../escaped.txt", Body=b"x")
+    dest = tmpdir.mkdir("dest")
+    events = list(bucket_manager.download_many(["data/../../escaped.txt", "shards/1/part-01"], str(dest)))
+    errors = {e.key: e.error for e in events}
+    assert isinstance(errors["data/../../escaped.txt"], ValueError) and errors["shards/1/part-01"] is None
+    assert not tmpdir.join("escaped.txt").exists()
+
+
+@mock_s3
+def test_bucket_region(mocker):
+    s3 = client("s3", region_name="eu-west-1")
+    s3.create_bucket(Bucket="my-bucket", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    clear_bucket_regions()
+    get_bucket_location = mocker.spy(S3Bucket.client, "get_bucket_location")
+
+    assert S3Bucket(name="my-bucket").region == "eu-west-1"
+    assert S3Bucket(arn="arn:aws:s3:::my-bucket").region == "eu-west-1"
+    assert get_bucket_location.call_count == 1
+    assert S3Bucket(name="other-bucket", region="eu-west-3").region == "eu-west-3"
+    assert S3Bucket(name="other-bucket").region == "eu-west-3"
+    assert S3Bucket(name="unknown-bucket", resolve_region=False).region is None
+    assert get_bucket_location.call_count == 1
+
+    mocker.patch.object(S3Bucket, "region_ttl", 0)
+    assert S3Bucket(name="my-bucket").region == "eu-west-1"
+    assert get_bucket_location.call_count == 2
+
+
+@mock_s3
+def test_regional_clients():
+    s3 = client("s3", region_name="us-west-2")
+    s3.create_bucket(Bucket="far-bucket", CreateBucketConfiguration={"LocationConstraint": "us-west-2"})
+    clear_bucket_regions()
+
+    bucket_manager = S3Bucket(name="far-bucket")
+    assert bucket_manager.region == "us-west-2"
+    assert bucket_manager.client is not S3Bucket.client
+    assert bucket_manager.client.meta.region_name == "us-west-2"
+    assert bucket_manager.client._get_credentials() is S3Bucket.client._get_credentials()
+    assert S3Bucket(name="far-bucket").client is bucket_manager.client
+    assert S3Bucket(name="my-bucket", region=S3Bucket.client.meta.region_name).client is S3Bucket.client
+
+    bucket_manager.client.put_object(Bucket="far-bucket", Key="data.txt", Body=b"data")
+    s3object = bucket_manager.get_object("data.txt")
+    assert (s3object.region, s3object.client) == ("us-west-2", bucket_manager.client)
+    assert s3object.download_fileobj().read() == b"data"
+    assert S3Object("unknown-bucket", "key").client is S3Object.client
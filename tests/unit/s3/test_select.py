@@ -0,0 +1,61 @@
+from oob.s3 import S3Object
+from oob.s3.select import S3Select, input_serialization
+
+
+def test_input_serialization():
+    assert input_serialization("csv") == {"CSV": {"FileHeaderInfo": "USE"}, "CompressionType": "NONE"}
+    assert input_serialization("json", "GZIP", {"Type": "DOCUMENT"}) == {
+        "JSON": {"Type": "DOCUMENT"},
+        "CompressionType": "GZIP",
+    }
+    assert input_serialization("parquet") == {"Parquet": {}, "CompressionType": "NONE"}
+
+
+def test_s3_select(mocker):
+    requests = []
+
+    def select_object_content(**kwargs):
+        requests.append(kwargs)
+        start = kwargs.get("ScanRange", {}).get("Start", 0)
+        payload = [
+            {"Records": {"Payload": f'{{"id": {start}, "name": "a"}}\n{{"id": {start + 1},'.encode()}},
+            {"Records": {"Payload": b' "name": "b"}\n'}},
+            {"Stats": {"Details": {"BytesScanned": 100, "BytesReturned": 40}}},
+            {"End": {}},
+        ]
+        return {"Payload": iter(payload)}
+
+    mocker.patch.object(S3Object.client, "select_object_content", side_effect=select_object_content)
+    obj = S3Object("my-bucket", "data.csv", size=1000)
+
+    rows = list(obj.select("SELECT s.id, s.name FROM S3Object s"))
+    assert rows == [{"id": 0, "name": "a"}, {"id": 1, "name": "b"}]
+    assert requests[0]["InputSerialization"] == {"CSV": {"FileHeaderInfo": "USE"}, "CompressionType": "NONE"}
+    assert "ScanRange" not in requests[0]
+
+    chunks = list(obj.select("SELECT * FROM S3Object s", raw=True))
+    assert b"".join(chunks).count(b"\n") == 2
+
+    requests.clear()
+    query = S3Select(obj, "SELECT * FROM S3Object s", input_format="json", scan_ranges=4, max_workers=2)
+    assert [row["id"] for row in query.iter_rows()] == [0, 1, 250, 251, 500, 501, 750, 751]
+    assert sorted((r["ScanRange"]["Start"], r["ScanRange"]["End"]) for r in requests) == [
+        (0, 249),
+        (250, 499),
+        (500, 749),
+        (750, 999),
+    ]
+    assert (query.bytes_scanned, query.bytes_returned) == (400, 160)
+
+    try:
+        S3Select(obj, "SELECT * FROM S3Object s", compression="GZIP", scan_ranges=4)
+        assert False
+    except ValueError:
+        pass
+
+
+def test_s3_select_csv_output(mocker):
+    payload = [{"Records": {"Payload": b'1,"multi\nline"\n2,si'}}, {"Records": {"Payload": b"mple\n"}}, {"End": {}}]
+    mocker.patch.object(S3Object.client, "select_object_content", return_value={"Payload": iter(payload)})
+    rows = list(S3Object("my-bucket", "data.csv").select("SELECT * FROM S3Object s", output_format="csv"))
+    assert rows == [["1", "multi\nline"], ["2", "simple"]]
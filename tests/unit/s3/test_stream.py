@@ -0,0 +1,51 @@
+import bz2
+import gzip
+import json
+import pytest
+from oob.s3 import S3Object
+from boto3 import client
+from moto import mock_s3
+
+
+def create_bucket():
+    s3 = client("s3", region_name="eu-west-1")
+    s3.create_bucket(Bucket="my-bucket", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    return s3
+
+
+@mock_s3
+def test_iter_lines():
+    bucket = create_bucket()
+    bucket.put_object(Bucket="my-bucket", Key="plain.txt", Body="héllo\r\nwörld\nlast".encode())
+    obj = S3Object("my-bucket", "plain.txt")
+    assert list(obj.iter_lines(chunk_size=3)) == ["héllo", "wörld", "last"]
+    assert list(obj.iter_lines(chunk_size=3, keepends=True)) == ["héllo\r\n", "wörld\n", "last"]
+
+
+@mock_s3
+def test_iter_records_jsonl_gz():
+    bucket = create_bucket()
+    records = [{"id": i, "name": f"name {i}"} for i in range(1000)]
+    lines = [json.dumps(r) + "\n" for r in records]
+    body = gzip.compress("".join(lines[:500]).encode()) + gzip.compress("".join(lines[500:]).encode())
+    bucket.put_object(Bucket="my-bucket", Key="data.jsonl.gz", Body=body)
+    obj = S3Object("my-bucket", "data.jsonl.gz")
+    assert list(obj.iter_records(chunk_size=256)) == records
+
+
+@mock_s3
+def test_iter_records_csv_bz2():
+    bucket = create_bucket()
+    body = bz2.compress(b'id;comment\n1;"two\nlines"\n2;simple\n')
+    bucket.put_object(Bucket="my-bucket", Key="data.csv.bz2", Body=body)
+    rows = list(S3Object("my-bucket", "data.csv.bz2").iter_records(delimiter=";", chunk_size=8))
+    assert rows == [{"id": "1", "comment": "two\nlines"}, {"id": "2", "comment": "simple"}]
+
+
+@mock_s3
+def test_iter_lines_zstd():
+    bucket = create_bucket()
+    zstandard = pytest.importorskip("zstandard")
+    body = zstandard.ZstdCompressor().compress(b"a\nb\nc\n")
+    bucket.put_object(Bucket="my-bucket", Key="data.zst", Body=body)
+    assert list(S3Object("my-bucket", "data.zst").iter_lines()) == ["a", "b", "c"]
@@ -0,0 +1,45 @@
+import os
+from oob.s3 import S3Bucket
+from boto3 import client
+from moto import mock_s3
+
+
+@mock_s3
+def test_sync(tmpdir, mocker):
+    s3 = client("s3", region_name="eu-west-1")
+    s3.create_bucket(Bucket="my-bucket", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    bucket_manager = S3Bucket(name="my-bucket")
+    src = tmpdir.mkdir("src")
+    for i in range(20):
+        src.join("models", f"model_{i}.bin").write(f"weights {i}", ensure=True)
+    src.join("README").write("readme")
+    s3.put_object(Bucket="my-bucket", Key="build/extra.txt", Body=b"extra")
+
+    summary = bucket_manager.sync_from(str(src), "build", max_workers=4)
+    assert (len(summary.transferred), summary.skipped, summary.errors) == (21, 0, [])
+    assert len(bucket_manager.list_keys("build/")) == 22
+
+    upload_file = mocker.spy(S3Bucket.client, "upload_file")
+    summary = bucket_manager.sync_from(str(src), "build/", checksum=True)
+    assert (summary.transferred, summary.skipped, upload_file.call_count) == ([], 21, 0)
+
+    src.join("models", "model_3.bin").write("new weights 3")
+    summary = bucket_manager.sync_from(str(src), "build", delete=True)
+    assert (summary.transferred, summary.deleted) == (["models/model_3.bin"], ["extra.txt"])
+    assert "build/extra.txt" not in bucket_manager.list_keys("build/")
+
+    dest = tmpdir.mkdir("dest")
+    dest.join("stale.txt").write("stale")
+    summary = bucket_manager.sync_to(str(dest), "build", delete=True)
+    assert (len(summary.transferred), summary.deleted) == (21, ["stale.txt"])
+    assert dest.join("models", "model_3.bin").read() == "new weights 3"
+
+    download_file = mocker.spy(S3Bucket.client, "download_file")
+    summary = bucket_manager.sync_to(str(dest), "build")
+    assert (summary.transferred, summary.skipped, download_file.call_count) == ([], 21, 0)
+    assert sorted(os.listdir(str(dest))) == ["README", "models"]
+
+    s3.put_object(Bucket="my-bucket", Key="build/../../escaped.txt", Body=b"x")
+    summary = bucket_manager.sync_to(str(dest), "build")
+    assert [(relpath, type(e)) for relpath, e in summary.errors] == [("../../escaped.txt", ValueError)]
+    assert not tmpdir.join("escaped.txt").exists()
@@ -0,0 +1,103 @@
+from oob.s3 import S3Bucket
+from oob.s3.transfer import S3TransferProfile, MB, pooled_client
+from boto3 import Session, client
+from moto import mock_s3
+
+
+@mock_s3
+def test_transfer_profile_stats(tmpdir):
+    s3 = client("s3", region_name="eu-west-1")
+    s3.create_bucket(Bucket="my-bucket", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    profile = S3TransferProfile(part_size=5 * MB, threshold=5 * MB, max_concurrency=4)
+    bucket_manager = S3Bucket(name="my-bucket", transfer_profile=profile)
+    p = tmpdir.join("large.bin")
+    p.write_binary(b"x" * (12 * MB))
+
+    reports = []
+    obj = bucket_manager.upload_file(str(p), "large.bin", callback=reports.append)
+    stats = reports[-1]
+    assert stats.finished and (stats.operation, stats.key) == ("upload", "large.bin")
+    assert (stats.bytes, stats.size, stats.parts, stats.retries) == (12 * MB, 12 * MB, 3, 0)
+    assert stats.elapsed > 0 and stats.throughput > 0
+    assert len(reports) > 1
+
+    size = obj.refresh().content_length
+    reports = []
+    obj.download_to(str(tmpdir.join("copy.bin")), callback=reports.append)
+    assert (reports[-1].bytes, reports[-1].parts) == (size, 3)
+    assert tmpdir.join("copy.bin").size() == size
+
+    reports = []
+    obj.download_fileobj(profile=S3TransferProfile(threshold=20 * MB, part_size=20 * MB), callback=reports.append)
+    assert (reports[-1].bytes, reports[-1].parts) == (size, 1)
+
+    reports = []
+    copy = obj.copy_to("my-bucket", "copy.bin", callback=reports.append)
+    assert (reports[-1].operation, reports[-1].parts, copy.size) == ("copy", 3, size)
+
+
+@mock_s3
+def test_resumable_upload(tmpdir, mocker):
+    from datetime import datetime, timedelta
+    from oob.s3.transfer import S3ResumableUpload
+
+    s3 = client("s3", region_name="eu-west-1")
+    s3.create_bucket(Bucket="my-bucket", CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+    bucket_manager = S3Bucket(name="my-bucket")
+    p = tmpdir.join("large.bin")
+    p.write_binary(b"".join(bytes([i]) * 5 * MB for i in range(4)) + b"end")
+    checkpoint = tmpdir.join("large.bin.s3upload.json")
+
+    upload_part = S3Bucket.client.upload_part
+    calls, failures = [], [3]
+
+    def flaky_upload_part(**kwargs):
+        calls.append(kwargs["PartNumber"])
+        if kwargs["PartNumber"] in failures:
+            failures.remove(kwargs["PartNumber"])
+            raise ConnectionError("network down")
+        return upload_part(**kwargs)
+
+    mocker.patch.object(S3Bucket.client, "upload_part", side_effect=flaky_upload_part)
+    upload = S3ResumableUpload(S3Bucket.client, str(p), "my-bucket", "large.bin", part_size=5 * MB, max_workers=1)
+    try:
+        upload.upload()
+        assert False
+    except ConnectionError:
+        pass
+    assert checkpoint.check() and sorted(upload.parts) == [1, 2, 4, 5]
+
+    calls.clear()
+    obj = bucket_manager.upload_file_resumable(str(p), "large.bin", part_size=5 * MB)
+    assert calls == [3] and not checkpoint.check()
+    assert s3.get_object(Bucket="my-bucket", Key="large.bin")["Body"].read() == p.read_binary()
+    assert obj.size == 20 * MB + 3
+
+    s3.create_multipart_upload(Bucket="my-bucket", Key="tmp/stale.bin")
+    s3.create_multipart_upload(Bucket="my-bucket", Key="other/stale.bin")
+    initiated = s3.list_multipart_uploads(Bucket="my-bucket")["Uploads"][0]["Initiated"]
+    now = initiated + timedelta(minutes=30)
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now
+
+    mocker.patch("oob.s3.datetime", FrozenDatetime)
+    assert bucket_manager.abort_incomplete_uploads("tmp/", older_than=timedelta(hours=1)) == []
+    now = initiated + timedelta(hours=2)
+    aborted = bucket_manager.abort_incomplete_uploads("tmp/", older_than=timedelta(hours=1))
+    assert [u["Key"] for u in aborted] == ["tmp/stale.bin"]
+    assert [u["Key"] for u in s3.list_multipart_uploads(Bucket="my-bucket")["Uploads"]] == ["other/stale.bin"]
+
+
+def test_pooled_client():
+    session = Session(aws_access_key_id="role-key", aws_secret_access_key="role-secret", aws_session_token="token")
+    s3 = session.client("s3", region_name="eu-west-1", endpoint_url="http://localhost:9000")
+    assert pooled_client(s3, 5) is s3
+    pooled = pooled_client(s3, 32)
+    assert pooled is pooled_client(s3, 32)
+    assert (pooled.meta.endpoint_url, pooled.meta.region_name) == ("http://localhost:9000", "eu-west-1")
+    assert pooled.meta.config.max_pool_connections == 32
+    assert pooled._get_credentials() is s3._get_credentials()
+    assert pooled._get_credentials().get_frozen_credentials().access_key == "role-key"